@@ -0,0 +1,164 @@
+from typing import Optional
+from sqlalchemy import event, inspect, select, update, insert, delete, case, func, cast, Float
+from sqlalchemy.orm import Session
+from app import models
+
+# Student columns that feed the dashboard aggregates
+TRACKED_FIELDS = ("department", "current_cgpa", "growth_index", "academic_dna_score", "career_readiness_score", "risk_level")
+
+RISK_WEIGHTS = {"High": 1.0, "Medium": 0.5}
+DEFAULT_RISK_WEIGHT = 0.1
+
+_table = models.DepartmentAggregate.__table__
+_students = models.Student.__table__
+
+
+def _contribution(values: dict):
+    """Map one student's tracked values to (department key, aggregate deltas)."""
+    risk_level = values.get("risk_level")
+    return values.get("department") or "", {
+        "student_count": 1,
+        "cgpa_sum": values.get("current_cgpa") or 0.0,
+        "growth_sum": values.get("growth_index") or 0.0,
+        "skill_sum": values.get("academic_dna_score") or 0.0,
+        "readiness_sum": values.get("career_readiness_score") or 0.0,
+        "risk_sum": RISK_WEIGHTS.get(risk_level, DEFAULT_RISK_WEIGHT),
+        "high_risk_count": 1 if risk_level == "High" else 0,
+        "medium_risk_count": 1 if risk_level == "Medium" else 0,
+    }
+
+
+def _apply(connection, values: dict, sign: int):
+    department, delta = _contribution(values)
+    result = connection.execute(
+        update(_table)
+        .where(_table.c.department == department)
+        .values({col: _table.c[col] + sign * v for col, v in delta.items()})
+    )
+    if result.rowcount == 0 and sign > 0:
+        connection.execute(insert(_table).values(department=department, **delta))
+
+
+def _current_values(target) -> dict:
+    return {name: getattr(target, name) for name in TRACKED_FIELDS}
+
+
+def _previous_values(connection, target) -> dict:
+    """Values as they are in the database, before the pending UPDATE/DELETE."""
+    state = inspect(target)
+    values = {}
+    for name in TRACKED_FIELDS:
+        history = state.attrs[name].history
+        if history.deleted:
+            values[name] = history.deleted[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        else:
+            # Old value was never loaded (expired or overwritten blind), so read the row back
+            row = connection.execute(
+                select(*[_students.c[n] for n in TRACKED_FIELDS]).where(_students.c.id == target.id)
+            ).mappings().first()
+            return dict(row) if row else {}
+    return values
+
+
+@event.listens_for(models.Student, "after_insert")
+def _student_inserted(mapper, connection, target):
+    _apply(connection, _current_values(target), 1)
+
+
+@event.listens_for(models.Student, "before_update")
+def _student_updated(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in TRACKED_FIELDS):
+        return
+    previous = _previous_values(connection, target)
+    if previous:
+        _apply(connection, previous, -1)
+    _apply(connection, _current_values(target), 1)
+
+
+@event.listens_for(models.Student, "before_delete")
+def _student_deleted(mapper, connection, target):
+    previous = _previous_values(connection, target)
+    if previous:
+        _apply(connection, previous, -1)
+
+
+def rebuild(db: Session):
+    """
+    Recompute every department aggregate from the students table with a single GROUP BY.
+    Needed after bulk SQL writes (query.update/delete, bulk inserts) that bypass the ORM events above.
+    """
+    risk = _students.c.risk_level
+    department = func.coalesce(_students.c.department, "")
+    grouped = select(
+        department,
+        func.count(),
+        func.coalesce(func.sum(_students.c.current_cgpa), 0.0),
+        func.coalesce(func.sum(_students.c.growth_index), 0.0),
+        func.coalesce(func.sum(_students.c.academic_dna_score), 0.0),
+        func.coalesce(func.sum(_students.c.career_readiness_score), 0.0),
+        func.sum(case(*[(risk == level, weight) for level, weight in RISK_WEIGHTS.items()], else_=DEFAULT_RISK_WEIGHT)),
+        func.sum(case((risk == "High", 1), else_=0)),
+        func.sum(case((risk == "Medium", 1), else_=0)),
+    ).group_by(department)
+
+    db.execute(delete(_table))
+    db.execute(insert(_table).from_select(
+        ["department", "student_count", "cgpa_sum", "growth_sum", "skill_sum", "readiness_sum", "risk_sum", "high_risk_count", "medium_risk_count"],
+        grouped
+    ))
+    db.commit()
+
+
+def ensure_built(db: Session):
+    """Populate the aggregates once for databases seeded before they existed."""
+    has_aggregates = db.query(models.DepartmentAggregate).first() is not None
+    has_students = db.query(models.Student.id).first() is not None
+    if has_students and not has_aggregates:
+        rebuild(db)
+
+
+def institution_totals(db: Session):
+    """Institution-wide sums in one row (the dashboard divides by student_count)."""
+    t = _table.c
+    return db.query(
+        func.coalesce(func.sum(t.student_count), 0).label("student_count"),
+        func.sum(t.cgpa_sum).label("cgpa_sum"),
+        func.sum(t.growth_sum).label("growth_sum"),
+        func.sum(t.skill_sum).label("skill_sum"),
+        func.sum(t.readiness_sum).label("readiness_sum"),
+        func.sum(t.risk_sum).label("risk_sum"),
+        func.coalesce(func.sum(t.high_risk_count), 0).label("high_risk_count"),
+        func.coalesce(func.sum(t.medium_risk_count), 0).label("medium_risk_count"),
+    ).one()
+
+
+def department_ranking(db: Session):
+    """Per-department averages and high-risk percentage, best composite score first."""
+    t = _table.c
+    count = cast(t.student_count, Float)
+    avg_cgpa = t.cgpa_sum / count
+    avg_growth = t.growth_sum / count
+    avg_readiness = t.readiness_sum / count
+    return db.query(
+        t.department,
+        avg_cgpa.label("avg_cgpa"),
+        avg_growth.label("avg_growth"),
+        avg_readiness.label("placement_readiness"),
+        (t.skill_sum / count).label("skill_score"),
+        (t.high_risk_count * 100.0 / count).label("risk_percent"),
+    ).filter(
+        t.student_count > 0, t.department != "" # students without a department are left out of the ranking
+    ).order_by(
+        (avg_cgpa * 2 + avg_growth * 10 + avg_readiness).desc(), t.department
+    ).all()
+
+
+def student_total_query(department: Optional[str] = None):
+    """Student count from the aggregates (no students table scan); run with db.execute(...).scalar()."""
+    stmt = select(func.coalesce(func.sum(_table.c.student_count), 0))
+    if department:
+        stmt = stmt.where(_table.c.department == department)
+    return stmt
@@ -1,7 +1,29 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import numpy as np
 
 class AIModel:
+    # Registry version this instance was built from (None: default / unversioned)
+    version: Optional[str] = None
+
+    @classmethod
+    def from_artifact(cls, path: Optional[str], version: Optional[str] = None, **options) -> "AIModel":
+        """
+        Instance backed by the artifact at `path`, loaded lazily on first use or warm().
+        Models without parameters take no path and ignore it.
+        """
+        model = cls(path, **options) if path is not None else cls(**options)
+        model.version = version
+        return model
+
+    @property
+    def cache_version(self) -> str:
+        """Identifies this instance's outputs in result caches: the registry version, or "default"."""
+        return self.version or "default"
+
+    def warm(self):
+        """Load whatever the model needs before it takes traffic."""
+        pass
+
     def parse_input(self, data: Any) -> np.ndarray:
         raise NotImplementedError
 
@@ -8,22 +8,36 @@ class CGPAModel(AIModel):
         Predict next semester CGPA based on history.
         Uses a simple weighted average or linear trend for now.
         """
-        if not history:
-            return 0.0
-        
-        if len(history) == 1:
-            return history[0]
-        
-        # Simple trend analysis
-        x = np.arange(len(history))
-        y = np.array(history)
-        
-        # Linear regression: y = mx + c
-        A = np.vstack([x, np.ones(len(x))]).T
-        m, c = np.linalg.lstsq(A, y, rcond=None)[0]
-        
-        next_val = m * len(history) + c
-        return round(min(max(next_val, 0.0), 10.0), 2)
+        return self.predict_next_semester_batch([history])[0]
+
+    def predict_next_semester_batch(self, histories: List[List[float]]) -> List[float]:
+        """Linear-trend extrapolation for many histories of any length at once (see predict_next_matrix)."""
+        if not histories:
+            return []
+        lengths = np.array([len(h) for h in histories])
+        Y = np.zeros((len(histories), max(lengths.max(), 1)))
+        Y[np.arange(Y.shape[1]) < lengths[:, None]] = np.concatenate([np.asarray(h, dtype=float) for h in histories if len(h)] or [[]])
+        return [round(value, 2) for value in self.predict_next_matrix(Y, lengths).tolist()]
+
+    def predict_next_matrix(self, Y: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """
+        Next value for each row of Y, whose first lengths[i] entries are history i (rest zero-padded),
+        clipped to 0-10. Every row's least-squares line y = m*x + c over x = 0..n-1 comes from the
+        closed form m = sum((x - x_mean) * (y - y_mean)) / sum((x - x_mean)^2),
+        sum((x - x_mean)^2) = n(n^2 - 1)/12.
+        """
+        width = Y.shape[1]
+        mask = np.arange(width) < lengths[:, None]
+        n = np.maximum(lengths, 1).astype(float)
+        x_mean = (n - 1) / 2
+        y_mean = Y.sum(axis=1) / n
+        centered_x = np.where(mask, np.arange(width) - x_mean[:, None], 0.0)
+        sxx = np.maximum(n * (n * n - 1) / 12, 1e-12)
+        m = (centered_x * (Y - y_mean[:, None])).sum(axis=1) / sxx
+
+        # Next point x = n on the fitted line; 1-point histories carry forward, empty ones are 0
+        next_val = np.where(lengths >= 2, y_mean + m * (n - x_mean), Y[:, 0])
+        return np.clip(next_val, 0.0, 10.0)
 
     def analyze_growth(self, current: float, previous: float) -> Dict[str, Any]:
         if previous == 0:
@@ -0,0 +1,71 @@
+from typing import List, Optional
+import os
+import threading
+import numpy as np
+import joblib
+from sklearn.cluster import MiniBatchKMeans
+from .base import AIModel
+
+class PerformanceClusterModel(AIModel):
+    CLUSTER_NAMES = ["High Achievers", "Stable Performers", "Improving Students", "Critical Zone"]
+
+    def __init__(self, path: str, batch_size: int = 256):
+        self.path = path
+        self.batch_size = batch_size
+        self.model: Optional[MiniBatchKMeans] = None
+        # label -> rank (index into CLUSTER_NAMES); fixed at the initial fit so names stay stable
+        self.rank: Optional[np.ndarray] = None
+        self.mtime: Optional[float] = None
+        self._lock = threading.Lock()
+        self.load()
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.model is not None
+
+    def load(self):
+        """(Re)load the persisted model if the file changed since it was last read (refit_clusters.py replaces it)."""
+        if not os.path.exists(self.path):
+            return
+        mtime = os.path.getmtime(self.path)
+        if mtime == self.mtime:
+            return
+        with self._lock:
+            self.model, self.rank = joblib.load(self.path)
+            self.mtime = mtime
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Per-process temp file: API workers starting together may each fit and save the first model
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        joblib.dump((self.model, self.rank), tmp_path)
+        os.replace(tmp_path, self.path)
+        self.mtime = os.path.getmtime(self.path)
+
+    def parse_input(self, data: List[List[float]]) -> np.ndarray:
+        # [[cgpa, growth_index, academic_dna_score], ...]
+        return np.nan_to_num(np.asarray(data, dtype=float).reshape(-1, 3))
+
+    def fit(self, data: List[List[float]]):
+        """Full fit: when no persisted model exists, or on refit_clusters.py --full (cluster names are re-ranked)."""
+        X = self.parse_input(data)
+        model = MiniBatchKMeans(n_clusters=len(self.CLUSTER_NAMES), random_state=42, n_init=10, batch_size=self.batch_size).fit(X)
+        # Simple heuristic: Higher sum of centers = better cluster
+        order = np.argsort(np.sum(model.cluster_centers_, axis=1))[::-1]
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        with self._lock:
+            self.model, self.rank = model, rank
+            self.save()
+
+    def predict(self, data: List[List[float]]) -> np.ndarray:
+        """Ranked cluster index per row (index into CLUSTER_NAMES)."""
+        X = self.parse_input(data)
+        with self._lock:
+            return self.rank[self.model.predict(X)]
+
+    def refine(self, data: List[List[float]]):
+        """Mini-batch partial fit on a chunk of current metrics, keeping the ranks; save() after the last chunk."""
+        X = self.parse_input(data)
+        with self._lock:
+            self.model.partial_fit(X)
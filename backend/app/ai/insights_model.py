@@ -0,0 +1,55 @@
+from typing import Dict, Any, Optional
+import json
+import random
+from .base import AIModel
+
+DEPT_CAREERS = {
+    "CSE": ["Software Architect", "Data Scientist", "Full Stack Developer", "AI Engineer", "Cybersecurity Analyst"],
+    "ECE": ["Embedded Systems Engineer", "VLSI Design Engineer", "IoT Specialist", "Network Engineer"],
+    "MECH": ["Robotics Engineer", "Automotive Designer", "Supply Chain Analyst", "Thermal Engineer"],
+    "EEE": ["Power Systems Engineer", "Control Systems Lead", "Renewable Energy Consultant"],
+    "CIVIL": ["Structural Engineer", "Urban Planner", "Construction Manager"]
+}
+
+DEPT_SUBJECTS = {
+    "CSE": ["Data Structures", "Algorithms", "OS", "DBMS", "Networks", "AI", "Compiler Design"],
+    "ECE": ["Circuits", "Digital Electronics", "Signals & Systems", "Microprocessors", "Communication"],
+    "MECH": ["Thermodynamics", "Fluid Mechanics", "Kinematics", "Manufacturing", "CAD/CAM"],
+    "EEE": ["Circuit Theory", "Machines", "Power Systems", "Control Systems", "Analog Electronics"],
+    "CIVIL": ["Mechanics", "Structures", "Surveying", "Geotech", "Hydraulics"]
+}
+
+ICONS = ["🚀", "📊", "🧠", "🔧", "⚡", "🏗️"]
+
+class InsightsModel(AIModel):
+    def generate(self, student_id: str, department: Optional[str], current_cgpa: Optional[float]) -> Dict[str, Any]:
+        """
+        Career compass and learning analytics for one student, as plain column values for AIScore.
+        Deterministic per student ID and thread-safe: uses its own RNG instead of reseeding the global one.
+        """
+        rng = random.Random(int(student_id.encode().hex(), 16) % 10000)
+
+        # 1. Career Compass Logic
+        possible_roles = DEPT_CAREERS.get(department, DEPT_CAREERS["CSE"]) or ["Software Engineer"]
+        selected_roles = rng.sample(possible_roles, min(3, len(possible_roles)))
+
+        career_compass = []
+        base_match = int((current_cgpa or 0.0) * 8) + 10 # Base match % based on CGPA
+        for role in selected_roles:
+            match = min(98, base_match + rng.randint(-5, 10))
+            career_compass.append({
+                "role": role,
+                "fit": f"{match}% Match",
+                "icon": rng.choice(ICONS)
+            })
+
+        # 2. Learning Analytics Logic
+        subjects = list(DEPT_SUBJECTS.get(department, DEPT_SUBJECTS["CSE"]))
+        rng.shuffle(subjects)
+
+        return {
+            "career_suggestions": json.dumps(career_compass),
+            "recommended_courses": json.dumps({"strong": subjects[:3], "weak": subjects[3:5]}),
+            "consistency_index": round(float(rng.uniform(0.6, 0.95)), 2),
+            "skill_gap_score": round(float(rng.uniform(10, 40)), 1)
+        }
@@ -0,0 +1,154 @@
+from typing import Any, Dict, List, Optional, Type
+from datetime import datetime, timezone
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from .base import AIModel
+
+METADATA_FILE = "metadata.json"
+CURRENT_FILE = "CURRENT"
+_VERSION_DIR = re.compile(r"^\.?v(\d+)(\.tmp)?$") # published (v3) or being staged (.v3.tmp)
+
+class ModelRegistry:
+    """
+    Versioned model artifacts on disk:
+
+        <root>/<name>/v1/metadata.json    {"version", "created_at", "artifact", ...caller fields}
+        <root>/<name>/v1/<artifact file>  (optional: parameter-free models only carry metadata)
+        <root>/<name>/CURRENT             active version, replaced atomically
+    """
+    def __init__(self, root: str):
+        self.root = root
+
+    def _dir(self, name: str, version: Optional[str] = None) -> str:
+        return os.path.join(self.root, name, version) if version else os.path.join(self.root, name)
+
+    def versions(self, name: str) -> List[str]:
+        if not os.path.isdir(self._dir(name)):
+            return []
+        found = [
+            v for v in os.listdir(self._dir(name))
+            if re.fullmatch(r"v\d+", v) and os.path.exists(os.path.join(self._dir(name, v), METADATA_FILE))
+        ]
+        return sorted(found, key=lambda v: int(v[1:]))
+
+    def metadata(self, name: str, version: str) -> Dict[str, Any]:
+        with open(os.path.join(self._dir(name, version), METADATA_FILE)) as f:
+            return json.load(f)
+
+    def artifact_path(self, name: str, version: str) -> Optional[str]:
+        artifact = self.metadata(name, version).get("artifact")
+        return os.path.join(self._dir(name, version), artifact) if artifact else None
+
+    def current_version(self, name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self._dir(name), CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def publish(self, name: str, artifact: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None, activate: bool = False) -> str:
+        """Copy `artifact` into a new version directory and return the version name."""
+        os.makedirs(self._dir(name), exist_ok=True)
+        while True:
+            taken = [int(m.group(1)) for m in map(_VERSION_DIR.match, os.listdir(self._dir(name))) if m]
+            version = f"v{max(taken, default=0) + 1}"
+            staging = os.path.join(self._dir(name), f".{version}.tmp")
+            try:
+                os.makedirs(staging)
+                break
+            except FileExistsError: # another publisher claimed the same number first
+                continue
+        meta = dict(metadata or {}, version=version, created_at=datetime.now(timezone.utc).isoformat())
+        if artifact:
+            meta["artifact"] = os.path.basename(artifact)
+            shutil.copy2(artifact, os.path.join(staging, meta["artifact"]))
+        with open(os.path.join(staging, METADATA_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+        # versions() only lists directories with metadata, so the version appears fully written
+        os.replace(staging, self._dir(name, version))
+        if activate:
+            self.activate(name, version)
+        return version
+
+    def activate(self, name: str, version: str):
+        if version not in self.versions(name):
+            raise ValueError(f"Unknown version {version!r} of model {name!r}")
+        tmp_path = os.path.join(self._dir(name), f"{CURRENT_FILE}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(self._dir(name), CURRENT_FILE))
+
+class ModelSlot:
+    """
+    The live instance of one registered model. get() loads it lazily from the registry's CURRENT
+    version (or `default_path` while nothing is published). reload() builds and warms the new
+    version first and then swaps a single reference, so requests that already called get() finish
+    on the old instance and none wait for the load.
+    """
+    def __init__(self, registry: ModelRegistry, name: str, model_cls: Type[AIModel], default_path: Optional[str] = None, **options):
+        self.registry = registry
+        self.name = name
+        self.model_cls = model_cls
+        self.default_path = default_path
+        self.options = options
+        self._model: Optional[AIModel] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._model.version if self._model is not None else None
+
+    def _build(self, version: Optional[str]) -> AIModel:
+        path = self.registry.artifact_path(self.name, version) if version else self.default_path
+        model = self.model_cls.from_artifact(path, version, **self.options)
+        model.warm()
+        return model
+
+    def get(self) -> AIModel:
+        model = self._model
+        if model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._build(self.registry.current_version(self.name))
+                model = self._model
+        return model
+
+    def reload(self):
+        """Switch to the registry's CURRENT version if it differs from the loaded one."""
+        with self._lock:
+            version = self.registry.current_version(self.name)
+            if self._model is not None and version == self._model.version:
+                return
+            model = self._build(version)
+            self._model = model
+        logging.info(f"Model {self.name!r} now serving version {version or 'default'}")
+
+class RegistryWatcher:
+    """Background thread that polls CURRENT pointers, picking up activations made by other processes."""
+    def __init__(self, slots: List[ModelSlot], interval: float):
+        self.slots = slots
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="model-registry-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for slot in self.slots:
+                try:
+                    slot.reload()
+                except Exception as e:
+                    # Keep serving the loaded version; a broken artifact must not take the worker down
+                    logging.error(f"Reloading model {slot.name!r} failed: {e}")
@@ -1,4 +1,8 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+import hashlib
+import logging
+import os
+import threading
 import numpy as np
 try:
     import xgboost as xgb
@@ -6,11 +10,80 @@ except ImportError:
     xgb = None
 from .base import AIModel
 
+# Model input columns, in the order the booster was trained on
+FEATURES = ["attendance_percentage", "cgpa_trend", "failed_subjects", "feedback_score"]
+FEATURE_DEFAULTS = {"attendance_percentage": 100.0, "cgpa_trend": 0.0, "failed_subjects": 0, "feedback_score": 0.0}
+# Labels are 0/1 observed outcomes (features.iter_training_data), hence the logistic objective
+TRAIN_PARAMS = {"objective": "binary:logistic", "eval_metric": "logloss", "tree_method": "hist", "max_depth": 4, "eta": 0.1}
+
+def risk_levels(scores: np.ndarray) -> np.ndarray:
+    """Risk probability -> "High" / "Medium" / "Low", elementwise."""
+    return np.where(scores > 0.6, "High", np.where(scores > 0.3, "Medium", "Low"))
+
 class RiskModel(AIModel):
-    def __init__(self):
+    def __init__(self, path: Optional[str] = None, nthread: int = 1):
+        """
+        `path` is an XGBoost booster saved with Booster.save_model(); without it (or without xgboost)
+        scores come from the rule-based heuristic. `nthread` is per prediction call: requests already
+        run concurrently in the threadpool, so one thread each avoids oversubscribing the cores.
+        """
+        self.path = path
+        self.nthread = nthread
         self.model = None
-        # In a real scenario, load the model here: self.model = xgb.Booster({'nthread': 4})
-        # self.model.load_model('risk_model.json')
+        # SHA-256 of the loaded artifact, so unversioned artifacts replaced in place are told apart
+        self.artifact_digest: Optional[str] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load the booster once; safe to call from several threads."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if xgb is None or not self.path or not os.path.exists(self.path):
+                logging.info(f"Risk model artifact {self.path!r} not available; using heuristic scoring.")
+            else:
+                with open(self.path, "rb") as f:
+                    raw = f.read()
+                booster = xgb.Booster()
+                booster.load_model(bytearray(raw))
+                booster.set_param({"nthread": self.nthread})
+                self.model = booster
+                self.artifact_digest = hashlib.sha256(raw).hexdigest()
+                logging.info(f"Loaded risk model from {self.path}")
+            self._loaded = True
+
+    @property
+    def cache_version(self) -> str:
+        # The default artifact can be retrained in place under the same path, so key it by content
+        self.load()
+        if self.version:
+            return self.version
+        return f"default:{self.artifact_digest}" if self.artifact_digest else "heuristic"
+
+    def warm(self):
+        """Load the artifact and run one prediction, so the first request pays for neither."""
+        self.load()
+        self.predict_proba(np.zeros((1, len(FEATURES))))
+
+    def parse_input(self, data: List[Dict[str, Any]]) -> np.ndarray:
+        """Rows of student data -> (n, len(FEATURES)) array; missing or null fields take FEATURE_DEFAULTS."""
+        return np.array([
+            [FEATURE_DEFAULTS[name] if row.get(name) is None else row[name] for name in FEATURES]
+            for row in data
+        ], dtype=float).reshape(-1, len(FEATURES))
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Risk probability in [0, 1] per row of parse_input() output. Booster.inplace_predict is
+        thread-safe and skips building a DMatrix, so concurrent requests share one loaded booster.
+        """
+        self.load()
+        if self.model is None:
+            return self.score(X)
+        return np.asarray(self.model.inplace_predict(X), dtype=float)
 
     def predict(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -22,43 +95,66 @@ class RiskModel(AIModel):
         - feedback_score: float (0-5)
         - skill_gap_percent: float (0-100)
         """
-        attendance = data.get("attendance_percentage", 100.0)
-        cgpa_trend = data.get("cgpa_trend", 0.0)
-        failed_subjects = data.get("failed_subjects", 0)
-        
-        # Heuristic / Rule-based fallback if no model is trained
-        risk_score = 0.0
-        
+        return self.predict_batch([data])[0]
+
+    def predict_batch(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score many students at once; results are in input order."""
+        return self.predict_matrix(self.parse_input(data))
+
+    def predict_matrix(self, X: np.ndarray) -> List[Dict[str, Any]]:
+        """Risk score and level per row of an (n, len(FEATURES)) array."""
+        scores = self.predict_proba(X)
+        levels = risk_levels(scores)
+        return [
+            {"risk_score": round(score, 2), "risk_level": level}
+            for score, level in zip(scores.tolist(), levels.tolist())
+        ]
+
+    def contributions(self, X: np.ndarray) -> np.ndarray:
+        """
+        Per-feature SHAP values for each row of parse_input() output: (n, len(FEATURES) + 1), the last
+        column being the base value; each row sums to the model output. The booster uses XGBoost's
+        built-in exact TreeSHAP (log-odds space); the heuristic is additive, so its terms are exact.
+        """
+        self.load()
+        if self.model is None:
+            return np.column_stack([self._terms(X), np.zeros(len(X))])
+        return self.model.predict(xgb.DMatrix(X, feature_names=FEATURES), pred_contribs=True)
+
+    def score(self, X: np.ndarray) -> np.ndarray:
+        """Heuristic risk score in [0, 1] for each row of parse_input() output."""
+        # Normalize to 0-1
+        return np.clip(self._terms(X).sum(axis=1), 0.0, 1.0)
+
+    def _terms(self, X: np.ndarray) -> np.ndarray:
+        """Heuristic risk added by each feature, (n, len(FEATURES))."""
+        attendance, cgpa_trend, failed_subjects = X[:, 0], X[:, 1], X[:, 2]
+        terms = np.zeros_like(X, dtype=float)
+
+        # Rule-based fallback if no model is trained
         # Attendance factor (Weight: 0.4)
-        if attendance < 75.0:
-            risk_score += 0.4
-        elif attendance < 85.0:
-            risk_score += 0.2
-            
+        terms[:, 0] = np.where(attendance < 75.0, 0.4, np.where(attendance < 85.0, 0.2, 0.0))
+
         # CGPA Trend factor (Weight: 0.3)
-        if cgpa_trend < -0.5: # Significant drop
-            risk_score += 0.3
-        elif cgpa_trend < 0:
-            risk_score += 0.1
-            
+        terms[:, 1] = np.where(cgpa_trend < -0.5, 0.3, np.where(cgpa_trend < 0, 0.1, 0.0)) # -0.5: significant drop
+
         # Failed Subjects factor (Weight: 0.3)
-        if failed_subjects > 0:
-            risk_score += 0.3 * min(failed_subjects, 3) / 3.0
-            
-        # Normalize to 0-1
-        risk_score = min(max(risk_score, 0.0), 1.0)
-        
-        risk_level = "Low"
-        if risk_score > 0.6:
-            risk_level = "High"
-        elif risk_score > 0.3:
-            risk_level = "Medium"
-            
-        return {
-            "risk_score": round(risk_score, 2),
-            "risk_level": risk_level
-        }
-
-    def train(self, X, y):
-        # Placeholder for training logic
-        pass
+        terms[:, 2] = np.where(failed_subjects > 0, 0.3 * np.minimum(failed_subjects, 3) / 3.0, 0.0)
+        return terms
+
+    def train(self, dtrain, num_boost_round: int = 200, params: Optional[Dict[str, Any]] = None, evals=()):
+        """
+        Fit a booster on an xgb.DMatrix - in memory, or an external-memory matrix built from an
+        xgb.DataIter for data larger than RAM - and serve predictions from it on this instance.
+        """
+        if xgb is None:
+            raise RuntimeError("xgboost is required to train the risk model")
+        booster = xgb.train({**TRAIN_PARAMS, **(params or {})}, dtrain, num_boost_round=num_boost_round, evals=evals)
+        booster.set_param({"nthread": self.nthread})
+        with self._lock:
+            self.model, self._loaded = booster, True
+        return booster
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.model.save_model(path)
@@ -0,0 +1,127 @@
+from typing import Dict, List, Optional, Tuple
+import os
+import threading
+import numpy as np
+import joblib
+from sklearn.neighbors import BallTree
+from .base import AIModel
+
+class SimilarStudentsModel(AIModel):
+    """
+    Nearest-neighbour index over z-scored student metric vectors, one BallTree per department, so a
+    department-filtered query searches one tree and an institution-wide one merges per-tree results.
+    Built offline (build_similarity_index.py) and persisted with joblib; update() rebuilds only the
+    departments whose rows changed.
+    """
+    FEATURE_FIELDS = ["current_cgpa", "growth_index", "academic_dna_score", "career_readiness_score", "feedback_score"]
+
+    def __init__(self, path: str, leaf_size: int = 40):
+        self.path = path
+        self.leaf_size = leaf_size
+        self.mean: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+        # department -> (BallTree over normalized vectors, student ids, raw vectors), rows sorted by id
+        self.departments: Dict[str, Tuple[BallTree, np.ndarray, np.ndarray]] = {}
+        self.mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.mean is not None
+
+    def load(self):
+        """(Re)load the persisted index if the file changed since it was last read."""
+        if not os.path.exists(self.path):
+            return
+        mtime = os.path.getmtime(self.path)
+        if mtime == self.mtime:
+            return
+        with self._lock:
+            self.mean, self.scale, self.departments = joblib.load(self.path)
+            self.mtime = mtime
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Per-process temp file: API workers starting together may each build the first index
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        joblib.dump((self.mean, self.scale, self.departments), tmp_path)
+        os.replace(tmp_path, self.path)
+        self.mtime = os.path.getmtime(self.path)
+
+    def parse_input(self, data) -> np.ndarray:
+        return np.nan_to_num(np.asarray(data, dtype=float).reshape(-1, len(self.FEATURE_FIELDS)))
+
+    def _normalize(self, X: np.ndarray) -> np.ndarray:
+        return (X - self.mean) / self.scale
+
+    def _tree(self, ids: np.ndarray, X: np.ndarray) -> Tuple[BallTree, np.ndarray, np.ndarray]:
+        order = np.argsort(ids)
+        ids, X = ids[order], X[order]
+        return BallTree(self._normalize(X), leaf_size=self.leaf_size), ids, X
+
+    @staticmethod
+    def _group(rows) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """(student id, department, *FEATURE_FIELDS) rows -> department -> (ids, vectors)."""
+        grouped: Dict[str, Tuple[list, list]] = {}
+        for row in rows:
+            ids, vectors = grouped.setdefault(row[1] or "", ([], []))
+            ids.append(row[0])
+            vectors.append(row[2:])
+        return {dept: (np.array(ids, dtype=object), np.nan_to_num(np.array(vectors, dtype=float))) for dept, (ids, vectors) in grouped.items()}
+
+    def fit(self, rows):
+        """Full build: normalization statistics and every department's tree."""
+        grouped = self._group(rows)
+        with self._lock:
+            if grouped:
+                X = np.vstack([X for _, X in grouped.values()])
+                self.mean, self.scale = X.mean(axis=0), X.std(axis=0)
+                self.scale[self.scale == 0] = 1.0
+            else:
+                self.mean, self.scale = np.zeros(len(self.FEATURE_FIELDS)), np.ones(len(self.FEATURE_FIELDS))
+            self.departments = {dept: self._tree(ids, X) for dept, (ids, X) in grouped.items()}
+            self.save()
+
+    def update(self, rows) -> List[str]:
+        """
+        Rebuild the trees of departments whose students or vectors differ from `rows` (the full
+        current population), keeping the normalization; returns the rebuilt departments.
+        """
+        grouped = self._group(rows)
+        changed = []
+        with self._lock:
+            for dept, (ids, X) in grouped.items():
+                order = np.argsort(ids)
+                current = self.departments.get(dept)
+                if current is None or not (np.array_equal(current[1], ids[order]) and np.allclose(current[2], X[order])):
+                    self.departments[dept] = self._tree(ids, X)
+                    changed.append(dept)
+            for dept in set(self.departments) - set(grouped):
+                del self.departments[dept]
+                changed.append(dept)
+            if changed:
+                self.save()
+        return changed
+
+    def predict(self, data) -> np.ndarray:
+        return self._normalize(self.parse_input(data))
+
+    def query(self, vector, k: int = 10, department: Optional[str] = None, exclude: Optional[str] = None) -> List[Tuple[str, str, float]]:
+        """
+        The `k` students nearest to `vector` (raw FEATURE_FIELDS values), as (student id, department,
+        distance in standard deviations), nearest first; `exclude` is typically the query student.
+        """
+        q = self.predict([vector])
+        with self._lock:
+            trees = [(department, self.departments[department])] if department in self.departments else (
+                [] if department is not None else list(self.departments.items())
+            )
+            results = []
+            for dept, (tree, ids, _) in trees:
+                n = min(k + 1, len(ids))
+                if n == 0:
+                    continue
+                distances, rows = tree.query(q, k=n)
+                results.extend((ids[row], dept, float(distance)) for distance, row in zip(distances[0], rows[0]) if ids[row] != exclude)
+        results.sort(key=lambda r: (r[2], r[0]))
+        return results[:k]
@@ -0,0 +1,139 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+
+MAX_LEVEL = 5
+
+def normalize(skill_name: str) -> str:
+    return skill_name.strip().lower()
+
+class _Block:
+    """Students x skills proficiency matrix (CSC: each column is a posting list) plus per-row metadata."""
+    def __init__(self, entries: Dict[str, Tuple[Optional[str], Dict[int, float]]], n_skills: int):
+        self.ids = list(entries)
+        self.departments = np.array([entries[sid][0] or "" for sid in self.ids], dtype=object)
+        rows, cols, levels = [], [], []
+        for row, sid in enumerate(self.ids):
+            for col, level in entries[sid][1].items():
+                rows.append(row)
+                cols.append(col)
+                levels.append(level)
+        self.matrix = sparse.csc_matrix((levels, (rows, cols)), shape=(len(self.ids), n_skills), dtype=float)
+        self.alive = np.ones(len(self.ids), dtype=bool)
+
+    def entries(self) -> Dict[str, Tuple[Optional[str], Dict[int, float]]]:
+        """Inverse of the constructor, for the rows still alive."""
+        csr = self.matrix.tocsr()
+        return {
+            sid: (self.departments[row] or None, dict(zip(
+                csr.indices[csr.indptr[row]:csr.indptr[row + 1]].tolist(),
+                csr.data[csr.indptr[row]:csr.indptr[row + 1]].tolist()
+            )))
+            for row, sid in enumerate(self.ids) if self.alive[row]
+        }
+
+class SkillIndex:
+    """
+    Inverted index over student skills for "best candidates for these required skills" queries.
+
+    Proficiency levels live in a sparse students x skills matrix, so a query only touches the posting
+    lists of the requested skills and ranks every student in one vectorized pass. Students whose skills
+    change are tombstoned in the main matrix and rewritten into a small delta matrix; the two are merged
+    once the delta outgrows `merge_ratio` of the main one, so refreshes cost O(changed students).
+    """
+    def __init__(self, merge_ratio: float = 0.1):
+        self.merge_ratio = merge_ratio
+        self.vocabulary: Dict[str, int] = {}
+        self._main = _Block({}, 0)
+        self._main_rows: Dict[str, int] = {}
+        self._delta_entries: Dict[str, Tuple[Optional[str], Dict[int, float]]] = {}
+        self._delta = _Block({}, 0)
+
+    def __len__(self) -> int:
+        return int(self._main.alive.sum()) + len(self._delta_entries)
+
+    def _entries(self, rows: Iterable[Tuple[str, Optional[str], Optional[str], Optional[int]]]):
+        """(student id, department, skill name, level) rows -> {student id: (department, {column: level})}."""
+        entries = {}
+        for student_id, department, skill_name, level in rows:
+            _, skills = entries.setdefault(student_id, (department, {}))
+            level = min(level or 0, MAX_LEVEL)
+            # Level 0 is stored as absent, so the skill is reported missing rather than matched at 0
+            if skill_name and level > 0:
+                col = self.vocabulary.setdefault(normalize(skill_name), len(self.vocabulary))
+                # A skill listed twice counts once, at its best level
+                skills[col] = max(skills.get(col, 0), level)
+        return entries
+
+    def build(self, rows: Iterable[Tuple[str, Optional[str], Optional[str], Optional[int]]]):
+        """Replace the index with (student id, department, skill name, level) rows."""
+        self.vocabulary = {}
+        entries = self._entries(rows)
+        self._main = _Block(entries, len(self.vocabulary))
+        self._main_rows = {sid: row for row, sid in enumerate(self._main.ids)}
+        self._delta_entries = {}
+        self._delta = _Block({}, len(self.vocabulary))
+
+    def update(self, student_ids: Iterable[str], rows: Iterable[Tuple[str, Optional[str], Optional[str], Optional[int]]]):
+        """
+        Replace the given students' entries with `rows` (all of their skills); students in
+        `student_ids` without rows are removed.
+        """
+        entries = self._entries(rows)
+        for sid in student_ids:
+            row = self._main_rows.pop(sid, None)
+            if row is not None:
+                self._main.alive[row] = False
+            self._delta_entries.pop(sid, None)
+        self._delta_entries.update(entries)
+        if len(self._delta_entries) > self.merge_ratio * max(len(self._main_rows), 1000):
+            merged = self._main.entries()
+            merged.update(self._delta_entries)
+            self._main = _Block(merged, len(self.vocabulary))
+            self._main_rows = {sid: row for row, sid in enumerate(self._main.ids)}
+            self._delta_entries = {}
+        elif self._main.matrix.shape[1] < len(self.vocabulary):
+            self._main.matrix.resize((self._main.matrix.shape[0], len(self.vocabulary)))
+        self._delta = _Block(self._delta_entries, len(self.vocabulary))
+
+    def top_k(self, required_skills: List[str], k: int = 20, department: Optional[str] = None) -> List[Dict]:
+        """
+        The `k` students best matching `required_skills`, best first. A student's score is the sum of
+        their levels in the required skills over MAX_LEVEL * len(required_skills), so 1.0 means every
+        required skill at the top level; students matching none are left out.
+        """
+        required = list(dict.fromkeys(normalize(s) for s in required_skills if s.strip()))
+        known = [(name, self.vocabulary[name]) for name in required if name in self.vocabulary]
+        if not known or k <= 0:
+            return []
+        columns = [col for _, col in known]
+        names = np.array([name for name, _ in known], dtype=object)
+
+        candidates = []
+        for block in (self._main, self._delta):
+            postings = block.matrix[:, columns]
+            scores = np.asarray(postings.sum(axis=1)).ravel() / (MAX_LEVEL * len(required))
+            keep = block.alive & (scores > 0)
+            if department is not None:
+                keep &= block.departments == department
+            rows = np.flatnonzero(keep)
+            if len(rows) > k:
+                # Everything scoring at least the k-th best, ties included, so ties break by id below
+                kth = np.partition(scores[rows], len(rows) - k)[len(rows) - k]
+                rows = rows[scores[rows] >= kth]
+            postings = postings.tocsr()
+            for row in rows:
+                start, end = postings.indptr[row], postings.indptr[row + 1]
+                candidates.append((scores[row], block.ids[row], block.departments[row], postings.indices[start:end], postings.data[start:end]))
+
+        candidates.sort(key=lambda c: (-c[0], c[1]))
+        return [
+            {
+                "student_id": sid,
+                "department": dept or None,
+                "score": round(float(score), 4),
+                "matched_skills": {names[i]: int(level) for i, level in zip(matched, levels)},
+                "missing_skills": [name for name in required if name not in set(names[matched])],
+            }
+            for score, sid, dept, matched, levels in candidates[:k]
+        ]
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from .base import AIModel
 
 class SkillsModel(AIModel):
@@ -25,3 +25,7 @@ class SkillsModel(AIModel):
             "match_count": match_count,
             "total_required": total_required
         }
+
+    def analyze_gap_batch(self, requests: List[Tuple[List[Dict[str, Any]], List[str]]]) -> List[Dict[str, Any]]:
+        # Set arithmetic per student; batching saves the per-call HTTP and validation overhead
+        return [self.analyze_gap(current_skills, required_skills) for current_skills, required_skills in requests]
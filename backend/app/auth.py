@@ -1,21 +1,157 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
+import asyncio
+import multiprocessing
+import os
+import threading
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
 from app import schemas, database, models, config
+from app.cache import TTLCache
 
 pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def verify_password(plain_password, hashed_password):
+@dataclass(frozen=True)
+class CurrentUser:
+    """The authenticated principal, detached from any session so it can be cached across requests."""
+    id: str
+    email: str
+    role: models.UserRole
+    is_active: bool
+    full_name: Optional[str] = None
+    student_id: Optional[str] = None
+    staff_id: Optional[str] = None
+
+# token subject (email) -> CurrentUser. Per process: ORM writes below invalidate this process's entry,
+# other workers keep serving theirs for up to auth_cache_ttl_seconds.
+_principal_cache = TTLCache(maxsize=config.settings.auth_cache_max_size, ttl=config.settings.auth_cache_ttl_seconds)
+
+def invalidate_user(email: str):
+    """
+    Drop a cached principal. ORM writes to users, students and staff do this on their own; call it
+    after bulk (Query.delete/update) writes to users, which skip the ORM events.
+    """
+    _principal_cache.pop(email)
+
+def _principal_changed(target, *emails):
+    # Now, and again once the transaction commits, so a request that re-cached the old row in between
+    # doesn't keep it
+    session = object_session(target)
+    for email in filter(None, emails):
+        invalidate_user(email)
+        if session is not None:
+            session.info.setdefault("stale_principals", set()).add(email)
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _user_changed(mapper, connection, target):
+    # Covers role, is_active and name changes, and the old address after an email change
+    _principal_changed(target, target.email, *inspect(target).attrs.email.history.deleted)
+
+@event.listens_for(models.Student, "after_insert")
+@event.listens_for(models.Student, "after_delete")
+@event.listens_for(models.Staff, "after_insert")
+@event.listens_for(models.Staff, "after_delete")
+def _profile_changed(mapper, connection, target):
+    # CurrentUser carries the student / staff profile id
+    email = connection.execute(select(models.User.email).where(models.User.id == target.user_id)).scalar()
+    _principal_changed(target, email)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for email in session.info.pop("stale_principals", ()):
+        invalidate_user(email)
+
+async def _load_principal(db: AsyncSession, email: str) -> Optional[CurrentUser]:
+    result = await db.execute(
+        select(models.User, models.Student.id, models.Staff.id)
+        .outerjoin(models.Student, models.Student.user_id == models.User.id)
+        .outerjoin(models.Staff, models.Staff.user_id == models.User.id)
+        .where(models.User.email == email)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    user, student_id, staff_id = row
+    return CurrentUser(
+        id=user.id,
+        email=user.email,
+        role=user.role,
+        is_active=user.is_active,
+        full_name=user.full_name,
+        student_id=student_id,
+        staff_id=staff_id
+    )
+
+# sha256_crypt runs hundreds of thousands of rounds per call, so hashing and verification run in
+# worker processes: the event loop stays free and throughput scales with cores instead of the GIL.
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+
+def _verify(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password):
+def _hash(password):
     return pwd_context.hash(password)
 
+def _default_hash_workers() -> int:
+    return config.settings.password_hash_workers or os.cpu_count() or 1
+
+def _new_hash_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn rather than fork: the server process has live threads and database connections
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+def start_hash_pool(workers: Optional[int] = None):
+    """(Re)create the hashing pool and spawn its workers up front so the first logins don't pay for it."""
+    global _hash_pool
+    workers = workers or _default_hash_workers()
+    pool = _new_hash_pool(workers)
+    for future in [pool.submit(os.getpid) for _ in range(workers)]:
+        future.result()
+    with _hash_pool_lock:
+        previous, _hash_pool = _hash_pool, pool
+    if previous is not None:
+        previous.shutdown()
+
+def shutdown_hash_pool():
+    global _hash_pool
+    with _hash_pool_lock:
+        previous, _hash_pool = _hash_pool, None
+    if previous is not None:
+        previous.shutdown()
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            _hash_pool = _new_hash_pool(_default_hash_workers())
+        return _hash_pool
+
+def verify_password(plain_password, hashed_password):
+    # Blocking variant for sync routes (FastAPI threadpool) and scripts
+    return _get_hash_pool().submit(_verify, plain_password, hashed_password).result()
+
+def get_password_hash(password):
+    return _get_hash_pool().submit(_hash, password).result()
+
+def get_password_hashes(passwords: List[str]) -> List[str]:
+    # Many hashes at once (seeding, imports), spread across every pool worker
+    return list(_get_hash_pool().map(_hash, passwords))
+
+async def verify_password_async(plain_password, hashed_password):
+    return await asyncio.get_running_loop().run_in_executor(_get_hash_pool(), _verify, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await asyncio.get_running_loop().run_in_executor(_get_hash_pool(), _hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -26,7 +162,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, config.settings.secret_key, algorithm=config.settings.algorithm)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(database.get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -39,27 +175,31 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.email == email).first()
+    user = _principal_cache.get(email)
     if user is None:
-        raise credentials_exception
+        user = await _load_principal(db, email)
+        if user is None:
+            raise credentials_exception
+        _principal_cache.set(email, user)
     return user
 
-async def get_current_active_user(current_user: models.User = Depends(get_current_user)):
+async def get_current_active_user(current_user: CurrentUser = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def authenticate_user(db: Session, email: str, password: str):
+async def authenticate_user(db: AsyncSession, email: str, password: str):
     email_normalized = email.lower().strip()
     import logging
     logging.info(f"Attempting to authenticate user: {email_normalized}")
     
-    user = db.query(models.User).filter(models.User.email == email_normalized).first()
+    result = await db.execute(select(models.User).where(models.User.email == email_normalized))
+    user = result.scalars().first()
     if not user:
         logging.warning(f"User not found: {email_normalized}")
         return False
     
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         logging.warning(f"Invalid password for user: {email_normalized}")
         return False
         
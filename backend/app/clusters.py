@@ -0,0 +1,125 @@
+"""
+Performance cluster labels (Student.performance_cluster) from the persisted PerformanceClusterModel.
+
+Writes only predict: the ORM events label a student from the current model file, reloading it when it
+changed. Refining the centroids and relabelling everyone is the offline refit() (refit_clusters.py).
+The first fit happens at startup, or - when startup found too few students - on the first dashboard
+read once there are enough (ensure_fitted()).
+"""
+import threading
+from sqlalchemy import event, inspect, select, update, bindparam, func
+from sqlalchemy.orm import Session
+from app import models, config
+from app.database import SessionLocal
+from app.ai.cluster_model import PerformanceClusterModel
+
+FEATURE_FIELDS = ("current_cgpa", "growth_index", "academic_dna_score")
+
+cluster_model = PerformanceClusterModel(config.settings.cluster_model_path)
+
+_students = models.Student.__table__
+
+_fit_lock = threading.Lock()
+
+
+def _features(target):
+    return [[getattr(target, name) or 0.0 for name in FEATURE_FIELDS]]
+
+
+@event.listens_for(models.Student, "before_insert")
+def _label_new_student(mapper, connection, target):
+    cluster_model.load()
+    if cluster_model.is_fitted:
+        target.performance_cluster = int(cluster_model.predict(_features(target))[0])
+
+
+@event.listens_for(models.Student, "before_update")
+def _relabel_student(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in FEATURE_FIELDS):
+        cluster_model.load()
+        if cluster_model.is_fitted:
+            target.performance_cluster = int(cluster_model.predict(_features(target))[0])
+
+
+def ensure_labels(db: Session):
+    """
+    Fit the model on first use and label any students that have no cluster yet
+    (databases seeded before clustering was persisted, or bulk inserts that skip the ORM events).
+    """
+    cluster_model.load()
+    if not cluster_model.is_fitted:
+        X = db.execute(select(*[_students.c[n] for n in FEATURE_FIELDS])).all()
+        if len(X) < len(cluster_model.CLUSTER_NAMES):
+            return
+        cluster_model.fit(X)
+
+    _label(db, _students.c.performance_cluster.is_(None))
+
+
+def ensure_fitted():
+    """
+    ensure_labels() on the primary if no model is fitted yet, e.g. the app started with fewer students
+    than clusters. A file stat once a model exists.
+    """
+    cluster_model.load()
+    if cluster_model.is_fitted:
+        return
+    with _fit_lock:
+        db = SessionLocal()
+        try:
+            ensure_labels(db)
+        finally:
+            db.close()
+
+
+def _label(db: Session, where=None, chunk_size: int = 10000) -> int:
+    """Store the model's label for students matching `where` (all if None), keyset-paginated by id."""
+    stmt = select(_students.c.id, *[_students.c[n] for n in FEATURE_FIELDS]).order_by(_students.c.id).limit(chunk_size)
+    if where is not None:
+        stmt = stmt.where(where)
+    labelled, last_id = 0, None
+    while True:
+        rows = db.execute(stmt if last_id is None else stmt.where(_students.c.id > last_id)).all()
+        if not rows:
+            return labelled
+        labels = cluster_model.predict([row[1:] for row in rows])
+        db.execute(
+            update(_students).where(_students.c.id == bindparam("b_id")).values(performance_cluster=bindparam("b_label")),
+            [{"b_id": row[0], "b_label": int(label)} for row, label in zip(rows, labels)]
+        )
+        db.commit()
+        labelled += len(rows)
+        last_id = rows[-1][0]
+
+
+def refit(db: Session, full: bool = False, chunk_size: int = 10000) -> int:
+    """
+    Offline refit: refine the centroids with a partial fit over every student's current metrics (or,
+    with `full`, fit from scratch and re-rank), save the model for the API processes to pick up, and
+    relabel every student. Returns the number of students labelled.
+    """
+    cluster_model.load()
+    columns = [_students.c[n] for n in FEATURE_FIELDS]
+    if full or not cluster_model.is_fitted:
+        X = db.execute(select(*columns)).all()
+        if len(X) < len(cluster_model.CLUSTER_NAMES):
+            return 0
+        cluster_model.fit(X)
+    else:
+        result = db.execute(select(*columns), execution_options={"yield_per": chunk_size})
+        for rows in result.partitions(chunk_size):
+            cluster_model.refine(rows)
+        cluster_model.save()
+    return _label(db)
+
+
+def cluster_counts(db: Session):
+    """[(rank, count, avg_cgpa)] for labelled students, best cluster first."""
+    return (
+        db.query(models.Student.performance_cluster, func.count(models.Student.id), func.avg(models.Student.current_cgpa))
+        .filter(models.Student.performance_cluster.isnot(None))
+        .group_by(models.Student.performance_cluster)
+        .order_by(models.Student.performance_cluster)
+        .all()
+    )
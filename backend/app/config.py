@@ -1,12 +1,44 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./student_platform.db"
+    async_database_url: Optional[str] = None # defaults to database_url with the aiosqlite/asyncpg driver
+    # Optional read replica for read-only routes (a second SQLite file works for local testing)
+    replica_database_url: Optional[str] = None
+    replica_async_database_url: Optional[str] = None
+    replica_read_your_writes_seconds: float = 5.0 # route a client's reads to the primary this long after it commits
+    # Connection pool (ignored for in-memory SQLite)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800 # seconds; -1 disables
+    db_pool_pre_ping: bool = True
+    # SQLite PRAGMAs applied to every new connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 268435456 # bytes
+    sqlite_cache_size: int = -64000 # negative = KiB
+    sqlite_busy_timeout_ms: int = 5000
     redis_url: str = "redis://localhost:6379/0"
     secret_key: str = "supersecretkey"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # Bounds how long other API workers keep a changed or deleted account's cached principal
+    auth_cache_ttl_seconds: int = 15
+    auth_cache_max_size: int = 10000
+    password_hash_workers: int = 0 # 0 = one per CPU core
     debug: bool = True
+    cluster_model_path: str = "models/performance_clusters.joblib"
+    risk_model_path: str = "models/risk_model.json" # XGBoost booster used until a registry version is active
+    risk_model_nthread: int = 1 # threads per prediction call
+    model_registry_dir: str = "models/registry"
+    model_registry_poll_seconds: float = 10.0 # CURRENT pointer polling; 0 disables the watcher
+    similarity_index_path: str = "models/similar_students.joblib"
+    skill_index_rebuild_seconds: float = 300.0 # full skill index rebuild, dropping students deleted by other workers
+    prediction_cache_backend: str = "memory" # "redis" (redis_url, falls back to memory while unreachable) or "memory"
+    prediction_cache_size: int = 10000 # in-process entries (LRU)
+    prediction_cache_ttl_seconds: float = 3600.0
 
     class Config:
         env_file = ".env"
@@ -1,23 +1,159 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-import os
+from typing import Iterable, List, Optional
+from fastapi import Request
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
+from app.config import settings, Settings
+from app.cache import TTLCache
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./student_platform.db")
+def _to_async_url(url: str) -> str:
+    """Same database through its asyncio driver (aiosqlite / asyncpg)."""
+    scheme, rest = url.split("://", 1)
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    if scheme.startswith("postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
 
-if "sqlite" in DATABASE_URL:
-    engine = create_engine(
-        DATABASE_URL, connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(DATABASE_URL)
+def _is_memory_sqlite(url: str) -> bool:
+    return url.split("://", 1)[1] in ("", "/", "/:memory:") or "mode=memory" in url
+
+def _sqlite_pragma_listener(config: Settings):
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={config.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={config.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA mmap_size={int(config.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={int(config.sqlite_cache_size)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(config.sqlite_busy_timeout_ms)}")
+        cursor.close()
+    return set_pragmas
+
+def create_engine_from_settings(url: str, config: Settings = settings, is_async: bool = False):
+    """Build a sync or asyncio engine with the pool and SQLite tuning from `config`."""
+    kwargs = {"pool_pre_ping": config.db_pool_pre_ping}
+    is_sqlite = url.startswith("sqlite")
+    if is_sqlite:
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if not (is_sqlite and _is_memory_sqlite(url)):
+        # In-memory SQLite uses a single shared connection, so sizing doesn't apply
+        kwargs.update(
+            pool_size=config.db_pool_size,
+            max_overflow=config.db_max_overflow,
+            pool_timeout=config.db_pool_timeout,
+            pool_recycle=config.db_pool_recycle,
+        )
+
+    new_engine = create_async_engine(url, **kwargs) if is_async else create_engine(url, **kwargs)
+    if is_sqlite:
+        event.listen(new_engine.sync_engine if is_async else new_engine, "connect", _sqlite_pragma_listener(config))
+    return new_engine
+
+def pool_status(target) -> dict:
+    """Runtime connection pool counters for a sync or async engine."""
+    pool = target.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        counter = getattr(pool, name, None)
+        if callable(counter):
+            stats[name] = counter()
+    return stats
+
+DATABASE_URL = settings.database_url
+# Override to pick a different async driver/instance than the derived one
+ASYNC_DATABASE_URL = settings.async_database_url or _to_async_url(DATABASE_URL)
+REPLICA_DATABASE_URL = settings.replica_database_url
+REPLICA_ASYNC_DATABASE_URL = settings.replica_async_database_url or (REPLICA_DATABASE_URL and _to_async_url(REPLICA_DATABASE_URL))
+
+engine: Engine = create_engine_from_settings(DATABASE_URL)
+async_engine: AsyncEngine = create_engine_from_settings(ASYNC_DATABASE_URL, is_async=True)
+# Without a replica, read sessions share the primary engines
+read_engine: Engine = create_engine_from_settings(REPLICA_DATABASE_URL) if REPLICA_DATABASE_URL else engine
+async_read_engine: AsyncEngine = create_engine_from_settings(REPLICA_ASYNC_DATABASE_URL, is_async=True) if REPLICA_ASYNC_DATABASE_URL else async_engine
+
+class ReadOnlySession(Session):
+    """Session for replica reads; any attempt to flush changes is a bug in the route."""
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _reject_writes(session, flush_context, instances):
+    raise RuntimeError("Attempted to write through a read-only (replica) session")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine, class_=ReadOnlySession)
+# expire_on_commit=False: async sessions cannot lazy-refresh attributes after a commit
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
+AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession, sync_session_class=ReadOnlySession)
 
 Base = declarative_base()
 
-def get_db():
+# Read-your-writes: clients (keyed by their Authorization header) that committed a write recently
+# keep reading from the primary until the replica has had time to catch up.
+_recent_writers = TTLCache(maxsize=10000, ttl=settings.replica_read_your_writes_seconds)
+
+def _writer_key(request: Optional[Request]) -> Optional[str]:
+    return request.headers.get("authorization") if request is not None else None
+
+@event.listens_for(Session, "after_flush")
+def _mark_written(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(Session, "after_commit")
+def _remember_writer(session):
+    if session.info.pop("wrote", False) and session.info.get("writer_key"):
+        _recent_writers.set(session.info["writer_key"], True)
+
+def _wants_primary(request: Request) -> bool:
+    key = _writer_key(request)
+    return REPLICA_DATABASE_URL is not None and key is not None and _recent_writers.get(key, False)
+
+def get_db(request: Request = None):
     db = SessionLocal()
+    db.info["writer_key"] = _writer_key(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db(request: Request):
+    """Session for read-only routes: the replica, or the primary right after this client wrote."""
+    db = SessionLocal() if _wants_primary(request) else ReadSessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db(request: Request = None):
+    async with AsyncSessionLocal() as db:
+        db.info["writer_key"] = _writer_key(request)
+        yield db
+
+async def get_async_read_db(request: Request):
+    session_factory = AsyncSessionLocal if _wants_primary(request) else AsyncReadSessionLocal
+    async with session_factory() as db:
+        yield db
+
+def upsert(db: Session, table, rows: List[dict], index_elements: Iterable[str], update_columns: Iterable[str], only_missing: bool = False):
+    """
+    Bulk INSERT ... ON CONFLICT DO UPDATE (SQLite and PostgreSQL): new rows are inserted whole,
+    existing ones only get `update_columns` overwritten - or, with `only_missing`, filled where
+    NULL/empty. Does not commit.
+    """
+    if not rows:
+        return
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(table)
+    if only_missing:
+        set_ = {column: func.coalesce(func.nullif(table.c[column], ""), stmt.excluded[column]) for column in update_columns}
+    else:
+        set_ = {column: stmt.excluded[column] for column in update_columns}
+    stmt = stmt.on_conflict_do_update(index_elements=list(index_elements), set_=set_)
+    db.execute(stmt, rows)
+
+def get_pool_stats() -> dict:
+    stats = {"primary": pool_status(engine), "async": pool_status(async_engine)}
+    if REPLICA_DATABASE_URL:
+        stats["replica"] = pool_status(read_engine)
+        stats["replica_async"] = pool_status(async_read_engine)
+    return stats
@@ -0,0 +1,297 @@
+"""
+Per-student feature store: model inputs that would otherwise be aggregated from academic records,
+feedback and skills on every call are kept as running sums in student_features, updated in the same
+flush as the rows they summarize. Training, scoring and the /ai endpoints all derive their feature
+vectors from these sums, so they see exactly the same inputs.
+"""
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import event, inspect, select, update, insert, delete, case, func
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app import models
+from app.ai.risk_model import FEATURES, FEATURE_DEFAULTS
+
+# RiskModel.FEATURES first, so X[:, :len(FEATURES)] is the risk model input
+FEATURE_NAMES = FEATURES + ["skill_gap_percent"]
+FAIL_GRADES = ("F", "U", "RA")
+MAX_PROFICIENCY = 5
+# Training outcome (see iter_training_data): a fail, or a semester GPA this far below the earlier average
+OUTCOME_GPA_DROP = 0.5
+
+_table = models.StudentFeature.__table__
+_students = models.Student.__table__
+_records = models.AcademicRecord.__table__
+_feedback = models.Feedback.__table__
+_skills = models.Skill.__table__
+
+SUM_COLUMNS = [c.name for c in _table.columns if c.name not in ("student_id", "updated_at")]
+
+
+def _record_score(internal_marks, external_marks):
+    # Internal (/20) + external (/80) marks on a 10-point scale
+    return ((internal_marks or 0.0) + (external_marks or 0.0)) / 10
+
+
+def _record_contribution(values: dict) -> dict:
+    x = values.get("semester") or 0
+    y = _record_score(values.get("internal_marks"), values.get("external_marks"))
+    attendance = values.get("attendance_percentage")
+    return {
+        "record_count": 1,
+        "attendance_sum": attendance or 0.0,
+        "attendance_count": 0 if attendance is None else 1,
+        "failed_count": 1 if values.get("grade") in FAIL_GRADES else 0,
+        "semester_sum": x,
+        "semester_sq_sum": x * x,
+        "score_sum": y,
+        "semester_score_sum": x * y,
+    }
+
+
+def _feedback_contribution(values: dict) -> dict:
+    return {"feedback_count": 1, "rating_sum": values.get("overall_rating") or 0.0}
+
+
+def _skill_contribution(values: dict) -> dict:
+    return {"skill_count": 1, "proficiency_sum": values.get("proficiency_level") or 0}
+
+
+# source model -> (tracked columns, contribution of one row)
+SOURCES = {
+    models.AcademicRecord: (("student_id", "semester", "internal_marks", "external_marks", "grade", "attendance_percentage"), _record_contribution),
+    models.Feedback: (("student_id", "overall_rating"), _feedback_contribution),
+    models.Skill: (("student_id", "proficiency_level"), _skill_contribution),
+}
+
+
+def _apply(connection, student_id: Optional[str], delta: dict, sign: int):
+    if student_id is None:
+        return
+    now = datetime.now(timezone.utc)
+    result = connection.execute(
+        update(_table)
+        .where(_table.c.student_id == student_id)
+        .values({**{col: _table.c[col] + sign * v for col, v in delta.items()}, "updated_at": now})
+    )
+    if result.rowcount == 0 and sign > 0:
+        connection.execute(insert(_table).values(student_id=student_id, updated_at=now, **delta))
+
+
+def _previous_values(connection, target, fields) -> dict:
+    """Values as they are in the database, before the pending UPDATE/DELETE."""
+    state = inspect(target)
+    values = {}
+    for name in fields:
+        history = state.attrs[name].history
+        if history.deleted:
+            values[name] = history.deleted[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        else:
+            # Old value was never loaded (expired or overwritten blind), so read the row back
+            table = state.mapper.local_table
+            row = connection.execute(
+                select(*[table.c[n] for n in fields]).where(table.c.id == target.id)
+            ).mappings().first()
+            return dict(row) if row else {}
+    return values
+
+
+def _register(model, fields, contribution):
+    @event.listens_for(model, "after_insert")
+    def _inserted(mapper, connection, target):
+        values = {name: getattr(target, name) for name in fields}
+        _apply(connection, values["student_id"], contribution(values), 1)
+
+    @event.listens_for(model, "before_update")
+    def _updated(mapper, connection, target):
+        state = inspect(target)
+        if not any(state.attrs[name].history.has_changes() for name in fields):
+            return
+        previous = _previous_values(connection, target, fields)
+        if previous:
+            _apply(connection, previous["student_id"], contribution(previous), -1)
+        current = {name: getattr(target, name) for name in fields}
+        _apply(connection, current["student_id"], contribution(current), 1)
+
+    @event.listens_for(model, "before_delete")
+    def _deleted(mapper, connection, target):
+        previous = _previous_values(connection, target, fields)
+        if previous:
+            _apply(connection, previous["student_id"], contribution(previous), -1)
+
+
+for _model, (_fields, _contribution) in SOURCES.items():
+    _register(_model, _fields, _contribution)
+
+
+@event.listens_for(models.Student, "after_insert")
+def _student_inserted(mapper, connection, target):
+    # Every student has a row, so new students are scored with default features
+    connection.execute(insert(_table).values(student_id=target.id, updated_at=datetime.now(timezone.utc)))
+
+
+@event.listens_for(models.Student, "before_delete")
+def _student_deleted(mapper, connection, target):
+    connection.execute(delete(_table).where(_table.c.student_id == target.id))
+
+
+def _records_with_latest_semester():
+    # Record rows plus each student's latest semester, in one pass (no index on student_id needed)
+    latest = func.max(_records.c.semester).over(partition_by=_records.c.student_id)
+    return select(_records, latest.label("latest_semester")).subquery()
+
+
+def stats_query(before_latest_semester: bool = False):
+    """
+    Every student's sums recomputed from the source tables (student id, then SUM_COLUMNS); with
+    `before_latest_semester`, from the records before each student's latest semester only.
+    """
+    source = _records_with_latest_semester() if before_latest_semester else _records
+    semester = func.coalesce(source.c.semester, 0)
+    score = (func.coalesce(source.c.internal_marks, 0.0) + func.coalesce(source.c.external_marks, 0.0)) / 10
+    records = select(
+        source.c.student_id,
+        func.count().label("record_count"),
+        func.sum(func.coalesce(source.c.attendance_percentage, 0.0)).label("attendance_sum"),
+        func.count(source.c.attendance_percentage).label("attendance_count"),
+        func.sum(case((source.c.grade.in_(FAIL_GRADES), 1), else_=0)).label("failed_count"),
+        func.sum(semester).label("semester_sum"),
+        func.sum(semester * semester).label("semester_sq_sum"),
+        func.sum(score).label("score_sum"),
+        func.sum(semester * score).label("semester_score_sum"),
+    )
+    if before_latest_semester:
+        records = records.where(source.c.semester < source.c.latest_semester)
+    records = records.group_by(source.c.student_id).subquery()
+    feedback = select(
+        _feedback.c.student_id,
+        func.count().label("feedback_count"),
+        func.sum(func.coalesce(_feedback.c.overall_rating, 0.0)).label("rating_sum"),
+    ).group_by(_feedback.c.student_id).subquery()
+    skills = select(
+        _skills.c.student_id,
+        func.count().label("skill_count"),
+        func.sum(func.coalesce(_skills.c.proficiency_level, 0)).label("proficiency_sum"),
+    ).group_by(_skills.c.student_id).subquery()
+    source = {name: sub.c[name] for sub in (records, feedback, skills) for name in sub.c.keys() if name != "student_id"}
+    return (
+        select(_students.c.id, *[func.coalesce(source[name], 0).label(name) for name in SUM_COLUMNS])
+        .outerjoin(records, records.c.student_id == _students.c.id)
+        .outerjoin(feedback, feedback.c.student_id == _students.c.id)
+        .outerjoin(skills, skills.c.student_id == _students.c.id)
+    )
+
+
+def rebuild(db: Session):
+    """
+    Recompute every student's row from the source tables in one INSERT ... SELECT.
+    Needed after bulk SQL writes (seed_db --scale, query.update/delete) that bypass the ORM events above.
+    """
+    db.execute(delete(_table))
+    db.execute(insert(_table).from_select(
+        ["student_id", *SUM_COLUMNS, "updated_at"],
+        stats_query().add_columns(func.current_timestamp())
+    ))
+    db.commit()
+
+
+def ensure_built(db: Session):
+    """Populate the store once for databases seeded before it existed."""
+    has_features = db.execute(select(_table.c.student_id).limit(1)).first() is not None
+    has_students = db.execute(select(_students.c.id).limit(1)).first() is not None
+    if has_students and not has_features:
+        rebuild(db)
+
+
+def feature_matrix(rows) -> np.ndarray:
+    """(n, len(FEATURE_NAMES)) feature values from rows carrying the SUM_COLUMNS."""
+    if not rows:
+        return np.empty((0, len(FEATURE_NAMES)))
+    s = {name: np.array([getattr(row, name) or 0 for row in rows], dtype=float) for name in SUM_COLUMNS}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        attendance = np.where(s["attendance_count"] > 0, s["attendance_sum"] / s["attendance_count"], FEATURE_DEFAULTS["attendance_percentage"])
+        # Least-squares slope of record score over semester: (n Sxy - Sx Sy) / (n Sxx - Sx^2)
+        n = s["record_count"]
+        denominator = n * s["semester_sq_sum"] - s["semester_sum"] ** 2
+        trend = np.where(
+            (n >= 2) & (denominator > 1e-9),
+            (n * s["semester_score_sum"] - s["semester_sum"] * s["score_sum"]) / denominator,
+            FEATURE_DEFAULTS["cgpa_trend"]
+        )
+        # 0-10 ratings -> the 0-5 scale RiskModel expects
+        feedback = np.where(s["feedback_count"] > 0, s["rating_sum"] / s["feedback_count"] / 2, FEATURE_DEFAULTS["feedback_score"])
+        skill_gap = np.where(s["skill_count"] > 0, 100.0 * (1 - s["proficiency_sum"] / (MAX_PROFICIENCY * s["skill_count"])), 100.0)
+    return np.column_stack([attendance, trend, s["failed_count"], feedback, skill_gap])
+
+
+def feature_hashes(X: np.ndarray) -> List[str]:
+    """Short digest per row of feature values; it changes exactly when those values do."""
+    rounded = np.round(np.asarray(X, dtype=float), 6) + 0.0 # + 0.0 folds -0.0 into 0.0
+    return [hashlib.sha1(row.tobytes()).hexdigest()[:16] for row in rounded]
+
+
+def load_matrix(db: Session, student_ids: List[str], chunk_size: int = 10000) -> Tuple[List[str], np.ndarray]:
+    """Feature rows for the given students by primary key (unknown ids are skipped), in input order."""
+    rows = {}
+    for start in range(0, len(student_ids), chunk_size):
+        chunk = student_ids[start:start + chunk_size]
+        for row in db.execute(select(_table).where(_table.c.student_id.in_(chunk))):
+            rows[row.student_id] = row
+    found = [sid for sid in dict.fromkeys(student_ids) if sid in rows]
+    return found, feature_matrix([rows[sid] for sid in found])
+
+
+def get_features(db: Session, student_ids: List[str]) -> Dict[str, Dict[str, float]]:
+    """student id -> {feature name: value} for many students in one indexed read."""
+    ids, X = load_matrix(db, student_ids)
+    return {sid: dict(zip(FEATURE_NAMES, values)) for sid, values in zip(ids, X.tolist())}
+
+
+def get_student_features(db: Session, student_id: str) -> Optional[Dict[str, float]]:
+    return get_features(db, [student_id]).get(student_id)
+
+
+def outcome_query():
+    """Per student with records: any fail in their latest semester, and that semester's GPA (mean record score)."""
+    source = _records_with_latest_semester()
+    score = (func.coalesce(source.c.internal_marks, 0.0) + func.coalesce(source.c.external_marks, 0.0)) / 10
+    return (
+        select(
+            source.c.student_id,
+            func.max(case((source.c.grade.in_(FAIL_GRADES), 1), else_=0)).label("failed_latest"),
+            func.avg(score).label("latest_gpa"),
+        )
+        .where(source.c.semester == source.c.latest_semester)
+        .group_by(source.c.student_id)
+    )
+
+
+def iter_training_data(conn: Connection, chunk_size: int = 10000) -> Iterator[Tuple[List[str], np.ndarray, np.ndarray]]:
+    """
+    Stream (student ids, X, y) chunks of `chunk_size` students through a server-side cursor, so
+    memory stays bounded by one chunk no matter how large the history tables are.
+
+    The label is an observed outcome, not Student.risk_level (which the scoring job writes): y = 1 when
+    the student failed a subject in their latest semester, or that semester's GPA fell OUTCOME_GPA_DROP
+    or more below their average before it. X is recomputed from the records before that semester (plus
+    feedback and skills), so students need records in at least two semesters to be included.
+    """
+    outcome = outcome_query().subquery()
+    stmt = stats_query(before_latest_semester=True)
+    stmt = (
+        stmt.join(outcome, outcome.c.student_id == _students.c.id)
+        .where(stmt.selected_columns.record_count > 0)
+        .add_columns(outcome.c.failed_latest, outcome.c.latest_gpa)
+    )
+    result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+    for rows in result.partitions(chunk_size):
+        X = feature_matrix(rows)[:, :len(FEATURES)]
+        earlier_gpa = np.array([row.score_sum / row.record_count for row in rows])
+        latest_gpa = np.array([row.latest_gpa for row in rows], dtype=float)
+        failed = np.array([row.failed_latest for row in rows], dtype=bool)
+        y = (failed | (earlier_gpa - latest_gpa >= OUTCOME_GPA_DROP)).astype(float)
+        yield [row.id for row in rows], X, y
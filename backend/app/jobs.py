@@ -0,0 +1,41 @@
+"""Bookkeeping for batch jobs (score_risk.py, forecast_cgpa.py): one job_runs row per run."""
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+from sqlalchemy.orm import Session
+from app import models
+
+
+def last_run(db: Session, job: str) -> Optional[models.JobRun]:
+    """Most recent successful run of `job`, if any."""
+    return (
+        db.query(models.JobRun)
+        .filter(models.JobRun.job == job, models.JobRun.status == "success")
+        .order_by(models.JobRun.started_at.desc())
+        .first()
+    )
+
+
+@contextmanager
+def recorded_run(db: Session, job: str, model_version: Optional[str] = None) -> Iterator[models.JobRun]:
+    """
+    Record the enclosed work as one run of `job`: committed as "running" up front, then "success" or
+    "failed" (with the error, rolling back uncommitted work) and its duration. The body sets
+    students_processed on the yielded row.
+    """
+    run = models.JobRun(job=job, started_at=datetime.now(timezone.utc), model_version=model_version)
+    db.add(run)
+    db.commit()
+    started = time.perf_counter()
+    try:
+        yield run
+        run.status = "success"
+    except Exception as e:
+        db.rollback()
+        run.status, run.error = "failed", str(e)
+        raise
+    finally:
+        run.finished_at = datetime.now(timezone.utc)
+        run.duration_seconds = round(time.perf_counter() - started, 3)
+        db.commit()
@@ -2,13 +2,15 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine, Base, SessionLocal
 from app.routers import users, auth_router, ai, admin, staff, student
-from app import models, auth as auth_utils
+from app import models, aggregates, clusters, features, similarity, pagination, config, migrations, auth as auth_utils
+from app.ai.registry import RegistryWatcher
+import asyncio
 import random
 import string
 import logging
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables and add columns missing from older databases
+migrations.upgrade(engine)
 
 app = FastAPI(title="Student Academic Development Platform API")
 
@@ -19,14 +21,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[pagination.NEXT_CURSOR_HEADER, pagination.TOTAL_COUNT_HEADER],
 )
 
 
+model_watcher = RegistryWatcher(list(ai.MODEL_SLOTS.values()), config.settings.model_registry_poll_seconds)
+
 @app.on_event("startup")
 async def startup_event():
     # Seeding is now handled by standalone seed_db.py
+    await asyncio.get_running_loop().run_in_executor(None, auth_utils.start_hash_pool)
+    for slot in ai.MODEL_SLOTS.values():
+        await asyncio.get_running_loop().run_in_executor(None, slot.get)
+    if config.settings.model_registry_poll_seconds > 0:
+        model_watcher.start()
+    db = SessionLocal()
+    try:
+        aggregates.ensure_built(db)
+        features.ensure_built(db)
+        clusters.ensure_labels(db)
+        similarity.ensure_built(db)
+    finally:
+        db.close()
     logging.info("Backend started successfully.")
 
+@app.on_event("shutdown")
+def shutdown_event():
+    model_watcher.stop()
+    auth_utils.shutdown_hash_pool()
+
 app.include_router(auth_router.router)
 app.include_router(users.router)
 app.include_router(admin.router)
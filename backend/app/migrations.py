@@ -0,0 +1,56 @@
+"""
+Schema upgrades for databases created before a column was added to an existing model.
+
+create_all() only creates missing tables, so columns added to tables that already exist are listed in
+ADDED_COLUMNS and added with a guarded ALTER TABLE (plus their indexes) when the database lacks them.
+upgrade() runs at app import and in the batch scripts, before anything reads the new columns.
+"""
+import logging
+from typing import List
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateColumn
+from app import models
+
+# (model, column name), oldest first; columns must be nullable or have a server default
+ADDED_COLUMNS = [
+    (models.Student, "performance_cluster"),
+    (models.AIScore, "risk_explanation"),
+]
+
+
+def _has_column(engine: Engine, table_name: str, name: str) -> bool:
+    return any(column["name"] == name for column in inspect(engine).get_columns(table_name))
+
+
+def add_missing_columns(engine: Engine) -> List[str]:
+    """ALTER TABLE ... ADD COLUMN for each ADDED_COLUMNS entry the database lacks; returns the ones added."""
+    added = []
+    for model, name in ADDED_COLUMNS:
+        table = model.__table__
+        if _has_column(engine, table.name, name):
+            continue
+        column = table.c[name]
+        preparer = engine.dialect.identifier_preparer
+        ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {CreateColumn(column).compile(dialect=engine.dialect)}"
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(ddl))
+                for index in table.indexes:
+                    if name in index.columns:
+                        index.create(bind=conn, checkfirst=True)
+        except DBAPIError:
+            # Another worker starting at the same time may have added it first
+            if not _has_column(engine, table.name, name):
+                raise
+            continue
+        logging.info(f"Migrated {table.name}: added column {name}")
+        added.append(f"{table.name}.{name}")
+    return added
+
+
+def upgrade(engine: Engine) -> List[str]:
+    """Create missing tables, then add missing columns to existing ones."""
+    models.Base.metadata.create_all(bind=engine)
+    return add_missing_columns(engine)
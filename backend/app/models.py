@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, joinedload, selectinload
 from sqlalchemy import func
 from .database import Base
 import uuid
@@ -46,12 +46,15 @@ class Student(Base):
     growth_index = Column(Float, default=0.0)
     risk_level = Column(String, default="Low") # Low, Medium, High
     career_readiness_score = Column(Float, default=0.0)
+    performance_cluster = Column(Integer, nullable=True, index=True) # 0 = High Achievers ... 3 = Critical Zone
 
     user = relationship("User", back_populates="student_profile")
     academic_records = relationship("AcademicRecord", back_populates="student")
     ai_scores = relationship("AIScore", back_populates="student", uselist=False)
     skills = relationship("Skill", back_populates="student")
     feedback = relationship("Feedback", back_populates="student")
+    # Maintained by app/features.py through Core statements, hence read-only here
+    features = relationship("StudentFeature", uselist=False, viewonly=True)
 
     @property
     def name(self):
@@ -115,6 +118,9 @@ class AIScore(Base):
     # AI Suggestions (Stored as JSON for flexibility)
     career_suggestions = Column(String, nullable=True) # JSON string
     recommended_courses = Column(String, nullable=True) # JSON string
+    # Top risk factors from the scoring job (JSON string, see app/scoring.py), tagged with the model
+    # version and feature hash it was computed for
+    risk_explanation = Column(String, nullable=True)
 
     student = relationship("Student", back_populates="ai_scores")
 
@@ -170,6 +176,36 @@ class Feedback(Base):
     student = relationship("Student", back_populates="feedback")
     faculty = relationship("User")
 
+class StudentFeature(Base):
+    __tablename__ = "student_features"
+
+    # Running sums per student, kept current by app/features.py as records, feedback and skills are
+    # written; feature values (averages, trend slope) are derived from them on read
+    student_id = Column(String, ForeignKey("students.id"), primary_key=True)
+    record_count = Column(Integer, default=0)
+    attendance_sum = Column(Float, default=0.0)
+    attendance_count = Column(Integer, default=0)
+    failed_count = Column(Integer, default=0)
+    # Least-squares sums of record score (y, 10-point scale) over semester (x) for the trend
+    semester_sum = Column(Float, default=0.0)
+    semester_sq_sum = Column(Float, default=0.0)
+    score_sum = Column(Float, default=0.0)
+    semester_score_sum = Column(Float, default=0.0)
+    feedback_count = Column(Integer, default=0)
+    rating_sum = Column(Float, default=0.0)
+    skill_count = Column(Integer, default=0)
+    proficiency_sum = Column(Float, default=0.0)
+    updated_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+# Eager loads for everything schemas.StudentDetail serializes: detail reads cost a fixed number of
+# queries instead of one lazy load per relationship, and they work on async sessions.
+STUDENT_DETAIL_LOADERS = (
+    joinedload(Student.user),
+    joinedload(Student.ai_scores),
+    selectinload(Student.academic_records),
+    selectinload(Student.feedback),
+)
+
 class Todo(Base):
     __tablename__ = "todos"
 
@@ -191,3 +227,31 @@ class StudyPlan(Base):
     sub_tasks = Column(String, nullable=True) # JSON string
     is_completed = Column(Boolean, default=False)
     actual_date = Column(DateTime, nullable=True)
+
+class DepartmentAggregate(Base):
+    __tablename__ = "department_aggregates"
+
+    # One row per department ("" for students without one); institutional totals are the sum of all rows
+    department = Column(String, primary_key=True)
+    student_count = Column(Integer, default=0)
+    cgpa_sum = Column(Float, default=0.0)
+    growth_sum = Column(Float, default=0.0)
+    skill_sum = Column(Float, default=0.0) # academic_dna_score
+    readiness_sum = Column(Float, default=0.0)
+    risk_sum = Column(Float, default=0.0) # High=1, Medium=0.5, Low=0.1
+    high_risk_count = Column(Integer, default=0)
+    medium_risk_count = Column(Integer, default=0)
+
+class JobRun(Base):
+    __tablename__ = "job_runs"
+
+    # One row per batch job run (e.g. score_risk.py); the last successful run's start is the next run's watermark
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    job = Column(String, nullable=False, index=True)
+    status = Column(String, default="running") # running / success / failed
+    started_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+    students_processed = Column(Integer, default=0)
+    model_version = Column(String, nullable=True)
+    error = Column(String, nullable=True)
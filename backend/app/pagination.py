@@ -0,0 +1,56 @@
+from typing import Any, Callable, Hashable, List, Optional
+import base64
+from fastapi import HTTPException, Response
+from app.cache import TTLCache
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Paging metadata travels in headers so the body stays the plain list older clients expect
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+# Filter combination -> row count, so paging through a result set doesn't re-count it per page
+_total_cache = TTLCache(maxsize=1024, ttl=30)
+
+def is_paged(limit: Optional[int], after: Optional[str]) -> bool:
+    return limit is not None or after is not None
+
+def encode_cursor(key: str) -> str:
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.b64decode(cursor.encode(), altchars=b"-_", validate=True).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def paginate(stmt, key_column, limit: int, after: Optional[str]):
+    """
+    Keyset paging on a unique, indexed column: rows strictly after the cursor, in key order.
+    Works on both Query and select(); fetches one extra row to tell whether another page follows.
+    """
+    if after:
+        stmt = stmt.filter(key_column > decode_cursor(after))
+    return stmt.order_by(key_column).limit(limit + 1)
+
+def finish_page(response: Response, rows: List[Any], limit: int, total: Optional[int] = None, key: Callable[[Any], str] = lambda row: row.id) -> List[Any]:
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(rows[-1]))
+    if total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
+    return rows
+
+def cached_total(key: Hashable, compute: Callable[[], int]) -> int:
+    total = _total_cache.get(key)
+    if total is None:
+        total = compute()
+        _total_cache.set(key, total)
+    return total
+
+def get_cached_total(key: Hashable) -> Optional[int]:
+    return _total_cache.get(key)
+
+def set_cached_total(key: Hashable, total: int):
+    _total_cache.set(key, total)
@@ -0,0 +1,112 @@
+"""
+Memoization for the /ai scoring endpoints: identical payloads scored by the same model version
+return the stored result instead of calling the model again.
+
+Keys are a SHA-256 of (endpoint, model cache_version, canonical JSON of the validated request body),
+so field order and omitted defaults don't matter and activating another model version misses cleanly;
+an unversioned artifact is identified by its content hash, so retraining it in place misses too.
+Entries live in Redis (Settings.redis_url, shared by all workers; size is bounded by the server's
+maxmemory / allkeys-lru policy) when prediction_cache_backend is "redis", otherwise in an in-process
+LRU. If Redis errors, the cache serves from the in-process LRU and retries Redis after a pause.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from app import config
+from app.cache import TTLCache
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Seconds to stay on the in-process cache after a Redis error before trying Redis again
+REDIS_RETRY_SECONDS = 30.0
+
+_MISSING = object()
+
+
+class PredictionCache:
+    def __init__(self, maxsize: int, ttl: float, redis_url: Optional[str] = None, prefix: str = "prediction:"):
+        self.ttl = ttl
+        self.prefix = prefix
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._redis = None
+        if redis_url and redis is not None:
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self._redis_down_until = 0.0
+        self._counts = {"hits": 0, "misses": 0, "redis_errors": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def key(self, namespace: str, version: Optional[str], payload: Any) -> str:
+        body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(f"{namespace}\n{version or 'default'}\n{body}".encode()).hexdigest()
+        return f"{self.prefix}{digest}"
+
+    def _redis_available(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, error: Exception):
+        self._count("redis_errors")
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        logging.warning(f"Prediction cache: Redis unavailable ({error}); using the in-process cache for {REDIS_RETRY_SECONDS:.0f}s")
+
+    def _get(self, key: str) -> Any:
+        if self._redis_available():
+            try:
+                raw = self._redis.get(key)
+                return _MISSING if raw is None else json.loads(raw)
+            except redis.RedisError as e:
+                self._redis_failed(e)
+        return self._local.get(key, _MISSING)
+
+    def _set(self, key: str, value: Any):
+        if self._redis_available():
+            try:
+                self._redis.set(key, json.dumps(value, separators=(",", ":")), ex=max(int(self.ttl), 1))
+                return
+            except redis.RedisError as e:
+                self._redis_failed(e)
+        self._local.set(key, value)
+
+    def get_or_compute(self, namespace: str, version: Optional[str], payload: Any, compute: Callable[[], Any]) -> Any:
+        """The cached result for this payload and model version, computing and storing it on a miss."""
+        key = self.key(namespace, version, payload)
+        value = self._get(key)
+        if value is not _MISSING:
+            self._count("hits")
+            return value
+        self._count("misses")
+        value = compute()
+        self._set(key, value)
+        return value
+
+    def clear(self):
+        """Empty the in-process cache and reset the counters (Redis entries expire on their own)."""
+        self._local.clear()
+        with self._lock:
+            self._counts = {name: 0 for name in self._counts}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            "backend": "redis" if self._redis_available() else "memory",
+            **counts,
+            "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0,
+            "local_size": len(self._local),
+        }
+
+
+prediction_cache = PredictionCache(
+    maxsize=config.settings.prediction_cache_size,
+    ttl=config.settings.prediction_cache_ttl_seconds,
+    redis_url=config.settings.redis_url if config.settings.prediction_cache_backend == "redis" else None,
+)
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload, contains_eager
 from sqlalchemy import func, case
 import random
-import numpy as np
-import pandas as pd
-from sklearn.cluster import KMeans
 from typing import List, Optional
-from app import database, models, schemas, auth
+from app import database, models, schemas, auth, aggregates, clusters, pagination, scoring, forecasting, singleflight
+from app.ai.insights_model import InsightsModel
+from app.routers import ai
+from app.prediction_cache import prediction_cache
 
 router = APIRouter(
     prefix="/admin",
@@ -14,64 +15,18 @@ router = APIRouter(
 )
 
 # --- Helper: AI Insight Generator ---
-import json
-def _generate_ai_insights(student, db: Session):
-    # Deterministic randomness based on student ID
-    seed = int(student.id.encode().hex(), 16) % 10000
-    random.seed(seed)
-    
-    # 1. Career Compass Logic
-    dept_careers = {
-        "CSE": ["Software Architect", "Data Scientist", "Full Stack Developer", "AI Engineer", "Cybersecurity Analyst"],
-        "ECE": ["Embedded Systems Engineer", "VLSI Design Engineer", "IoT Specialist", "Network Engineer"],
-        "MECH": ["Robotics Engineer", "Automotive Designer", "Supply Chain Analyst", "Thermal Engineer"],
-        "EEE": ["Power Systems Engineer", "Control Systems Lead", "Renewable Energy Consultant"],
-        "CIVIL": ["Structural Engineer", "Urban Planner", "Construction Manager"]
-    }
-    
-    possible_roles = dept_careers.get(student.department, dept_careers.get("CSE")) or []
-    if not possible_roles: possible_roles = ["Software Engineer"] # Fallback
-    selected_roles = random.sample(possible_roles, min(3, len(possible_roles)))
-    
-    career_compass = []
-    base_match = int(student.current_cgpa * 8) + 10 # Base match % based on CGPA
-    
-    for role in selected_roles:
-        match = min(98, base_match + random.randint(-5, 10))
-        career_compass.append({
-            "role": role,
-            "fit": f"{match}% Match",
-            "icon": random.choice(["🚀", "📊", "🧠", "🔧", "⚡", "🏗️"])
-        })
-        
-    # 2. Learning Analytics Logic
-    dept_subjects = {
-        "CSE": ["Data Structures", "Algorithms", "OS", "DBMS", "Networks", "AI", "Compiler Design"],
-        "ECE": ["Circuits", "Digital Electronics", "Signals & Systems", "Microprocessors", "Communication"],
-        "MECH": ["Thermodynamics", "Fluid Mechanics", "Kinematics", "Manufacturing", "CAD/CAM"],
-        "EEE": ["Circuit Theory", "Machines", "Power Systems", "Control Systems", "Analog Electronics"],
-        "CIVIL": ["Mechanics", "Structures", "Surveying", "Geotech", "Hydraulics"]
-    }
-    
-    subjects = dept_subjects.get(student.department, dept_subjects.get("CSE")) or []
-    random.shuffle(subjects)
-    
-    strong = subjects[:3]
-    weak = subjects[3:5]
-    
-    ai_data = {
-        "career_suggestions": json.dumps(career_compass),
-        "recommended_courses": json.dumps({"strong": strong, "weak": weak})
-    }
+insights_model = InsightsModel()
+
+def generate_ai_insights(student, db: Session):
+    """
+    Attach AI insights to a student (creating its AIScore or filling missing suggestions).
+    Runs when a student account is created (here and in users.create_user), never on reads;
+    bulk_generate_ai.py regenerates them in batch. The caller commits.
+    """
+    ai_data = insights_model.generate(student.id, student.department, student.current_cgpa)
 
     if not student.ai_scores:
-        student.ai_scores = models.AIScore(
-            student_id=student.id,
-            consistency_index=round(float(random.uniform(0.6, 0.95)), 2),
-            skill_gap_score=round(float(random.uniform(10, 40)), 1),
-            career_suggestions=ai_data["career_suggestions"],
-            recommended_courses=ai_data["recommended_courses"]
-        )
+        student.ai_scores = models.AIScore(student_id=student.id, **ai_data)
         db.add(student.ai_scores)
     else:
         # Populate missing data for existing records
@@ -80,11 +35,9 @@ def _generate_ai_insights(student, db: Session):
         if not student.ai_scores.recommended_courses:
             student.ai_scores.recommended_courses = ai_data["recommended_courses"]
     
-    db.commit()
-    
     return student
 
-def _generate_dynamic_action_plan(stats: schemas.InstitutionalStats, df: pd.DataFrame):
+def _generate_dynamic_action_plan(stats: schemas.InstitutionalStats):
     # Logic to vary the plan based on stats
     high_risk_ratio = stats.risk_ratio > 15
     low_dna = stats.dna_score < 75
@@ -123,34 +76,26 @@ def _generate_dynamic_action_plan(stats: schemas.InstitutionalStats, df: pd.Data
     )
 
 @router.get("/overview", response_model=schemas.DashboardOverview)
-def get_dashboard_overview(db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_active_user)):
+def get_dashboard_overview(db: Session = Depends(database.get_read_db), current_user: auth.CurrentUser = Depends(auth.get_current_active_user)):
     if current_user.role != models.UserRole.ADMIN:
         return {"error": "Unauthorized"}
-    
-    # 1. Fetch Basic Data
-    students = db.query(models.Student).all()
-    total_students = len(students)
+    # Concurrent dashboard loads share one computation (the result is the same for every admin)
+    return singleflight.analytics.do(("overview",), lambda: _build_dashboard_overview(db))
+
+def _build_dashboard_overview(db: Session):
+    # 1. Fetch Pre-aggregated Totals (maintained on student writes, see app/aggregates.py)
+    totals = aggregates.institution_totals(db)
+    total_students = totals.student_count
     if total_students == 0:
         return {} # Handle empty DB
-        
-    df = pd.DataFrame([
-        {
-            "id": s.id,
-            "cgpa": s.current_cgpa,
-            "growth": s.growth_index,
-            "skill": s.academic_dna_score, # Using dna score as skill depth for formula
-            "readiness": s.career_readiness_score,
-            "risk": 1 if s.risk_level == "High" else (0.5 if s.risk_level == "Medium" else 0.1),
-            "dept": s.department
-        } for s in students
-    ])
 
     # 2. Institutional Stats & DNA Score
-    avg_cgpa = df['cgpa'].mean()
-    avg_growth = df['growth'].mean()
-    avg_skill = df['skill'].mean()
-    avg_readiness = df['readiness'].mean()
-    avg_risk_stability = 1 - df['risk'].mean()
+    avg_cgpa = totals.cgpa_sum / total_students
+    avg_growth = totals.growth_sum / total_students
+    avg_skill = totals.skill_sum / total_students
+    avg_readiness = totals.readiness_sum / total_students
+    avg_risk = totals.risk_sum / total_students
+    avg_risk_stability = 1 - avg_risk
 
     # Formula: (0.30 * CGPA/10 * 100) + (0.20 * Growth/5 * 100) + (0.20 * Skill) + (0.15 * Readiness) + (0.15 * Risk Stability * 100)
     # Mapping to 0-100 scale
@@ -167,13 +112,13 @@ def get_dashboard_overview(db: Session = Depends(database.get_db), current_user:
         active_students=total_students, # Logic for "active" can be refined later
         placement_readiness_avg=round(float(avg_readiness), 2),
         dna_score=round(float(dna_score), 2),
-        risk_ratio=round(float(df['risk'].mean() * 100), 2),
+        risk_ratio=round(float(avg_risk * 100), 2),
         avg_growth_index=round(float(avg_growth), 2)
     )
 
     # 3. Early Warning Stats
-    high_risk = len(df[df['risk'] == 1])
-    med_risk = len(df[df['risk'] == 0.5])
+    high_risk = totals.high_risk_count
+    med_risk = totals.medium_risk_count
     
     early_warning = schemas.EarlyWarningStats(
         high_risk_count=high_risk,
@@ -182,49 +127,31 @@ def get_dashboard_overview(db: Session = Depends(database.get_db), current_user:
         dropout_probability_next_6m=round(float((high_risk / total_students * 0.8 + med_risk / total_students * 0.3) * 100), 2)
     )
 
-    # 4. KMeans Clustering
-    X = df[['cgpa', 'growth', 'skill']].values
-    kmeans = KMeans(n_clusters=4, random_state=42, n_init=10).fit(X)
-    df['cluster'] = kmeans.labels_
-    
-    cluster_names = ["High Achievers", "Stable Performers", "Improving Students", "Critical Zone"]
-    # Sort cluster names based on avg CGPA of cluster to ensure mapping is somewhat consistent
-    cluster_centers = kmeans.cluster_centers_
-    # Simple heuristic: Higher sum of centers = better cluster
-    rank_idx = np.argsort(np.sum(cluster_centers, axis=1))[::-1]
+    # 4. Performance Clusters (labels stored per student by the persisted model, see app/clusters.py)
+    clusters.ensure_fitted()
+    counts = {rank: (count, avg_cgpa) for rank, count, avg_cgpa in clusters.cluster_counts(db)}
     
     perf_clusters = []
-    for i, real_idx in enumerate(rank_idx):
-        count = len(df[df['cluster'] == real_idx])
+    for i, name in enumerate(clusters.cluster_model.CLUSTER_NAMES):
+        count, avg_cgpa = counts.get(i, (0, 0.0))
         perf_clusters.append(schemas.PerformanceCluster(
-            name=cluster_names[i],
+            name=name,
             count=count,
             percentage=round(float(count / total_students * 100), 2),
-            description=f"Group with average CGPA of {round(float(cluster_centers[real_idx][0]),2)}"
+            description=f"Group with average CGPA of {round(float(avg_cgpa or 0.0),2)}"
         ))
 
-    # 5. Department Ranking
-    dept_stats = df.groupby('dept').agg({
-        'cgpa': 'mean',
-        'growth': 'mean',
-        'readiness': 'mean',
-        'skill': 'mean',
-        'risk': lambda x: (x == 1).astype(int).sum() / len(x) * 100
-    }).reset_index()
-    
-    # Calculate a composite score for ranking
-    dept_stats['composite'] = (dept_stats['cgpa'] * 2 + dept_stats['growth'] * 10 + dept_stats['readiness']).rank(ascending=False)
-    
+    # 5. Department Ranking (averages, risk % and composite ordering computed in SQL)
     dept_ranking = [
         schemas.DeptPerformanceRank(
-            department=row['dept'],
-            avg_cgpa=round(float(row['cgpa']), 2),
-            avg_growth=round(float(row['growth']), 2),
-            placement_readiness=round(float(row['readiness']), 2),
-            skill_score=round(float(row['skill']), 2),
-            risk_percent=round(float(row['risk']), 2),
-            overall_rank=int(row['composite'])
-        ) for _, row in dept_stats.sort_values('composite').iterrows()
+            department=row.department,
+            avg_cgpa=round(float(row.avg_cgpa), 2),
+            avg_growth=round(float(row.avg_growth), 2),
+            placement_readiness=round(float(row.placement_readiness), 2),
+            skill_score=round(float(row.skill_score), 2),
+            risk_percent=round(float(row.risk_percent), 2),
+            overall_rank=rank
+        ) for rank, row in enumerate(aggregates.department_ranking(db), 1)
     ]
 
     # 6. Placement Forecast
@@ -236,7 +163,7 @@ def get_dashboard_overview(db: Session = Depends(database.get_db), current_user:
     )
 
     # 7. Faculty Impact & Resource Opt
-    staff = db.query(models.Staff).limit(5).all()
+    staff = db.query(models.Staff).options(joinedload(models.Staff.user)).limit(5).all()
     faculty_impact = [
         schemas.FacultyImpactRank(
             name=s.user.full_name if s.user else "Faculty",
@@ -260,7 +187,7 @@ def get_dashboard_overview(db: Session = Depends(database.get_db), current_user:
     weekly_insight = f"{best_dept} department shows strong placement readiness but {worst_dept} requires focused remedial intervention in Core Engineering subjects."
 
     # 9. Dynamic Action Plan
-    action_plan = _generate_dynamic_action_plan(inst_stats, df)
+    action_plan = _generate_dynamic_action_plan(inst_stats)
 
     return schemas.DashboardOverview(
         institutional=inst_stats,
@@ -275,10 +202,13 @@ def get_dashboard_overview(db: Session = Depends(database.get_db), current_user:
     )
 
 @router.get("/stats")
-def get_admin_stats(db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_active_user)):
+def get_admin_stats(db: Session = Depends(database.get_db), current_user: auth.CurrentUser = Depends(auth.get_current_active_user)):
     if current_user.role != models.UserRole.ADMIN:
         return {"error": "Unauthorized"}
     
+    return singleflight.analytics.do(("stats",), lambda: _build_admin_stats(db))
+
+def _build_admin_stats(db: Session):
     total_students = db.query(models.Student).count()
     # Assuming total strength is the same or some fixed number for now, or just total users
     total_strength = db.query(models.User).count()
@@ -288,18 +218,90 @@ def get_admin_stats(db: Session = Depends(database.get_db), current_user: models
         "total_students": total_students
     }
 
+@router.get("/db/pool")
+def get_db_pool_stats(current_user: auth.CurrentUser = Depends(auth.get_current_active_user)):
+    if current_user.role != models.UserRole.ADMIN:
+        return {"error": "Unauthorized"}
+    return database.get_pool_stats()
+
+@router.get("/prediction-cache")
+def get_prediction_cache_stats(current_user: auth.CurrentUser = Depends(auth.get_current_active_user)):
+    """Hit/miss counters of the /ai prediction cache in this worker."""
+    if current_user.role != models.UserRole.ADMIN:
+        return {"error": "Unauthorized"}
+    return prediction_cache.stats()
+
+@router.get("/models")
+def get_models(current_user: auth.CurrentUser = Depends(auth.get_current_active_user)):
+    if current_user.role != models.UserRole.ADMIN:
+        return {"error": "Unauthorized"}
+    return {
+        name: {
+            "serving": slot.version,
+            "current": ai.model_registry.current_version(name),
+            "versions": [ai.model_registry.metadata(name, v) for v in ai.model_registry.versions(name)]
+        }
+        for name, slot in ai.MODEL_SLOTS.items()
+    }
+
+@router.post("/models/{name}/activate")
+def activate_model(name: str, activation: schemas.ModelActivation, current_user: auth.CurrentUser = Depends(auth.get_current_active_user)):
+    """Point the registry at another version and hot-swap it here; other workers follow via their watcher."""
+    if current_user.role != models.UserRole.ADMIN:
+        return {"error": "Unauthorized"}
+    slot = ai.MODEL_SLOTS.get(name)
+    if slot is None:
+        return {"error": "Model not found"}
+    try:
+        ai.model_registry.activate(name, activation.version)
+    except ValueError as e:
+        return {"error": str(e)}
+    slot.reload()
+    return {"message": f"Model {name} now serving {slot.version}"}
+
+@router.get("/jobs", response_model=List[schemas.JobRun])
+def get_job_runs(
+    job: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(database.get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
+):
+    """Latest batch job runs (e.g. nightly risk scoring) with their status and duration, newest first."""
+    if current_user.role != models.UserRole.ADMIN:
+        return {"error": "Unauthorized"}
+    query = db.query(models.JobRun)
+    if job:
+        query = query.filter(models.JobRun.job == job)
+    return query.order_by(models.JobRun.started_at.desc()).limit(limit).all()
+
+@router.post("/jobs/cgpa-forecast", response_model=schemas.JobRun)
+def run_cgpa_forecast(
+    department: Optional[str] = None,
+    year: Optional[int] = None,
+    db: Session = Depends(database.get_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
+):
+    """Forecast next-semester CGPA for a department / year (default: everyone) and store it; a few seconds institution-wide."""
+    if current_user.role != models.UserRole.ADMIN:
+        return {"error": "Unauthorized"}
+    return forecasting.run_cgpa_forecast(db, ai.cgpa_model.get(), department, year)
+
 @router.get("/students", response_model=List[schemas.Student])
 def get_students(
+    response: Response,
     department: Optional[str] = Query(None),
     year: Optional[int] = Query(None),
     search: Optional[str] = Query(None),
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None),
+    db: Session = Depends(database.get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     if current_user.role != models.UserRole.ADMIN:
         return {"error": "Unauthorized"}
     
-    query = db.query(models.Student).join(models.User)
+    # Student.name reads the joined user row; populate it from the same join instead of lazy-loading per row
+    query = db.query(models.Student).join(models.User).options(contains_eager(models.Student.user))
     
     if department:
         query = query.filter(models.Student.department == department)
@@ -313,31 +315,48 @@ def get_students(
             (models.User.email.ilike(search_term))
         )
         
-    return query.all()
+    if not pagination.is_paged(limit, after):
+        return query.all()
+
+    limit = limit or pagination.DEFAULT_PAGE_SIZE
+    if search or year:
+        total = pagination.cached_total(("admin_students", department, year, search), query.count)
+    else:
+        total = db.execute(aggregates.student_total_query(department)).scalar()
+    rows = pagination.paginate(query, models.Student.id, limit, after).all()
+    return pagination.finish_page(response, rows, limit, total)
 
 @router.get("/students/{student_id}", response_model=schemas.StudentDetail)
 def get_student_detail(
     student_id: str,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     if current_user.role != models.UserRole.ADMIN:
         return {"error": "Unauthorized"}
     
-    student = db.query(models.Student).filter(models.Student.id == student_id).first()
+    # Pure read: insights are generated when the student is created (or by bulk_generate_ai.py),
+    # risk explanations by the scoring job (score_risk.py)
+    student = (
+        db.query(models.Student)
+        .options(*models.STUDENT_DETAIL_LOADERS, joinedload(models.Student.features))
+        .filter(models.Student.id == student_id)
+        .first()
+    )
     if not student:
         return {"error": "Student not found"}
-        
-    # --- Dynamic AI Insight Generation (Unique per student) ---
-    _generate_ai_insights(student, db)
 
-    return student
+    detail = schemas.StudentDetail.model_validate(student)
+    explanation = scoring.current_explanation(student, ai.risk_model.get().cache_version)
+    if explanation is not None:
+        detail.risk_explanation = schemas.RiskExplanation.model_validate(explanation)
+    return detail
 
 @router.delete("/students/{student_id}")
 def delete_student(
     student_id: str,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     if current_user.role != models.UserRole.ADMIN:
         return {"error": "Unauthorized"}
@@ -347,16 +366,19 @@ def delete_student(
         return {"error": "Student not found"}
         
     # Delete User accounts associated
+    email = student.user.email if student.user else None
     db.query(models.User).filter(models.User.id == student.user_id).delete()
     db.delete(student)
     db.commit()
+    if email:
+        auth.invalidate_user(email)
     return {"message": "Student deleted successfully"}
 
 @router.delete("/staff/{staff_id}")
 def delete_staff(
     staff_id: str,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     if current_user.role != models.UserRole.ADMIN:
         return {"error": "Unauthorized"}
@@ -365,22 +387,28 @@ def delete_staff(
     if not staff:
         return {"error": "Staff not found"}
         
+    email = staff.user.email if staff.user else None
     db.query(models.User).filter(models.User.id == staff.user_id).delete()
     db.delete(staff)
     db.commit()
+    if email:
+        auth.invalidate_user(email)
     return {"message": "Staff deleted successfully"}
 
 @router.get("/staff", response_model=List[schemas.Staff])
 def get_staff(
+    response: Response,
     department: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None),
+    db: Session = Depends(database.get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     if current_user.role != models.UserRole.ADMIN:
         return {"error": "Unauthorized"}
     
-    query = db.query(models.Staff).join(models.User)
+    query = db.query(models.Staff).join(models.User).options(contains_eager(models.Staff.user))
     if department:
         query = query.filter(models.Staff.department == department)
         
@@ -391,34 +419,48 @@ def get_staff(
             (models.User.email.ilike(search_term))
         )
         
-    return query.all()
+    if not pagination.is_paged(limit, after):
+        return query.all()
+
+    limit = limit or pagination.DEFAULT_PAGE_SIZE
+    total = pagination.cached_total(("admin_staff", department, search), query.count)
+    rows = pagination.paginate(query, models.Staff.id, limit, after).all()
+    return pagination.finish_page(response, rows, limit, total)
 
 @router.get("/staff/{staff_id}", response_model=schemas.StaffDetail)
 def get_staff_detail(
     staff_id: str,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     if current_user.role != models.UserRole.ADMIN:
         return {"error": "Unauthorized"}
     
-    staff = db.query(models.Staff).filter(models.Staff.id == staff_id).first()
+    staff = db.query(models.Staff).options(joinedload(models.Staff.user)).filter(models.Staff.id == staff_id).first()
     if not staff:
         return {"error": "Staff not found"}
         
     return staff
 
 @router.post("/students", response_model=schemas.Student)
-def create_student(
+async def create_student(
     student_in: schemas.StudentCreate,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     if current_user.role != models.UserRole.ADMIN:
         return {"error": "Unauthorized"}
-    
-    # 1. Generate Institutional Email: firstname.deptbatch@gmail.com
+
+    # Roll number and password need no database, so the hash runs in the hashing pool first and the
+    # sync session work then runs in the threadpool
     batch = {1: "25", 2: "24", 3: "23", 4: "22"}.get(student_in.year, "25")
+    roll_number = f"7376{batch}{student_in.department.upper()}{student_in.year}{random.randint(100, 999)}"
+    unique_password = f"{student_in.full_name.split()[0]}@{roll_number[-4:]}#"
+    hashed_password = await auth.get_password_hash_async(unique_password)
+    return await run_in_threadpool(_create_student, db, student_in, batch, roll_number, unique_password, hashed_password)
+
+def _create_student(db: Session, student_in: schemas.StudentCreate, batch: str, roll_number: str, unique_password: str, hashed_password: str):
+    # 1. Generate Institutional Email: firstname.deptbatch@gmail.com
     name_parts = student_in.full_name.strip().split()
     first_name = name_parts[0].lower()
     dept_code = student_in.department.lower()
@@ -437,17 +479,12 @@ def create_student(
     if existing_again:
         base_email = f"{first_name}{random.randint(10, 99)}.{dept_code}{batch}@gmail.com"
 
-    # 2. Generate Roll Number
-    roll_number = f"7376{batch}{student_in.department.upper()}{student_in.year}{random.randint(100, 999)}"
-
-    # 3. Create User
+    # 2. Create User (roll number and password were generated by the caller)
     # Use institutional email as the primary login email as requested
-    unique_password = f"{student_in.full_name.split()[0]}@{roll_number[-4:]}#"
-    
     new_user = models.User(
         email=base_email, # This is the institutional email
         full_name=student_in.full_name,
-        hashed_password=auth.get_password_hash(unique_password),
+        hashed_password=hashed_password,
         plain_password=unique_password,
         role=models.UserRole.STUDENT,
         institutional_email=base_email
@@ -455,7 +492,7 @@ def create_student(
     db.add(new_user)
     db.flush()
 
-    # 4. Create Student Profile
+    # 3. Create Student Profile
     new_student = models.Student(
         user_id=new_user.id,
         roll_number=roll_number,
@@ -474,23 +511,27 @@ def create_student(
         career_readiness_score=0.0
     )
     db.add(new_student)
+    db.flush()
+
+    # 4. Generate Initial AI Profile (same transaction as the student)
+    generate_ai_insights(new_student, db)
     db.commit()
     db.refresh(new_student)
-
-    # 5. Generate Initial AI Profile
-    _generate_ai_insights(new_student, db)
     
     return new_student
 
 @router.post("/staff", response_model=schemas.Staff)
-def create_staff(
+async def create_staff(
     staff_in: schemas.StaffCreate,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     if current_user.role != models.UserRole.ADMIN:
         return {"error": "Unauthorized"}
-    
+    hashed_password = await auth.get_password_hash_async(staff_in.password)
+    return await run_in_threadpool(_create_staff, db, staff_in, hashed_password)
+
+def _create_staff(db: Session, staff_in: schemas.StaffCreate, hashed_password: str):
     # 1. Generate Institutional Email
     name_parts = staff_in.full_name.strip().split()
     first_name = name_parts[0].lower()
@@ -501,7 +542,7 @@ def create_staff(
     new_user = models.User(
         email=staff_in.personal_email,
         full_name=staff_in.full_name,
-        hashed_password=auth.get_password_hash(staff_in.password),
+        hashed_password=hashed_password,
         role=models.UserRole.FACULTY,
         institutional_email=inst_email
     )
@@ -1,19 +1,29 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
-from app.ai.risk_model import RiskModel
+from app.ai.risk_model import RiskModel, FEATURES
 from app.ai.cgpa_model import CGPAModel
 from app.ai.skills_model import SkillsModel
+from app.ai.registry import ModelRegistry, ModelSlot
+from app import config, database, models, auth, features, skills, similarity, singleflight
+from app.prediction_cache import prediction_cache
 
 router = APIRouter(
     prefix="/ai",
     tags=["ai"]
 )
 
-# Initialize models
-risk_model = RiskModel()
-cgpa_model = CGPAModel()
-skills_model = SkillsModel()
+# Largest accepted batch; bigger jobs page through in several calls
+MAX_BATCH_SIZE = 10000
+
+# Models are served from the registry; endpoints take model = slot.get() once per request,
+# so a concurrent activation never switches versions halfway through one
+model_registry = ModelRegistry(config.settings.model_registry_dir)
+risk_model = ModelSlot(model_registry, "risk", RiskModel, default_path=config.settings.risk_model_path, nthread=config.settings.risk_model_nthread)
+cgpa_model = ModelSlot(model_registry, "cgpa", CGPAModel)
+skills_model = ModelSlot(model_registry, "skills", SkillsModel)
+MODEL_SLOTS = {slot.name: slot for slot in (risk_model, cgpa_model, skills_model)}
 
 class RiskRequest(BaseModel):
     attendance_percentage: float
@@ -28,21 +38,140 @@ class SkillsGapRequest(BaseModel):
     current_skills: List[Dict[str, Any]] # [{"name": "Python", "level": 3}]
     required_skills: List[str]
 
+class StudentIdsRequest(BaseModel):
+    student_ids: List[str] = Field(..., max_length=MAX_BATCH_SIZE)
+
+class SkillMatchRequest(BaseModel):
+    required_skills: List[str] = Field(..., min_length=1, max_length=100)
+    department: Optional[str] = None
+    top_k: int = Field(20, ge=1, le=500)
+
+class RiskBatchRequest(BaseModel):
+    items: List[RiskRequest] = Field(..., max_length=MAX_BATCH_SIZE)
+
+class CGPAPredictBatchRequest(BaseModel):
+    items: List[CGPAPredictRequest] = Field(..., max_length=MAX_BATCH_SIZE)
+
+class SkillsGapBatchRequest(BaseModel):
+    items: List[SkillsGapRequest] = Field(..., max_length=MAX_BATCH_SIZE)
+
+# Single-item endpoints are memoized per (payload, model cache_version) in app/prediction_cache.py
+
 @router.post("/predict-risk")
 def predict_risk(request: RiskRequest):
-    result = risk_model.predict(request.dict())
-    return result
+    model = risk_model.get()
+    return prediction_cache.get_or_compute("predict-risk", model.cache_version, request.dict(), lambda: model.predict(request.dict()))
 
-@router.post("/predict-cgpa")
-def predict_cgpa(request: CGPAPredictRequest):
-    prediction = cgpa_model.predict_next_semester(request.history)
-    growth = cgpa_model.analyze_growth(prediction, request.history[-1] if request.history else 0)
+def _predict_cgpa(model: CGPAModel, history: List[float]) -> Dict[str, Any]:
+    prediction = model.predict_next_semester(history)
+    growth = model.analyze_growth(prediction, history[-1] if history else 0)
     return {
         "predicted_next_cgpa": prediction,
         "growth_analysis": growth
     }
 
+@router.post("/predict-cgpa")
+def predict_cgpa(request: CGPAPredictRequest):
+    model = cgpa_model.get()
+    return prediction_cache.get_or_compute("predict-cgpa", model.cache_version, request.dict(), lambda: _predict_cgpa(model, request.history))
+
 @router.post("/analyze-skills")
 def analyze_skills(request: SkillsGapRequest):
-    result = skills_model.analyze_gap(request.current_skills, request.required_skills)
+    model = skills_model.get()
+    return prediction_cache.get_or_compute(
+        "analyze-skills", model.cache_version, request.dict(),
+        lambda: model.analyze_gap(request.current_skills, request.required_skills)
+    )
+
+# Batch variants: one result per item, in input order
+
+@router.post("/predict-risk/batch")
+def predict_risk_batch(request: RiskBatchRequest):
+    return risk_model.get().predict_batch([item.dict() for item in request.items])
+
+@router.post("/predict-cgpa/batch")
+def predict_cgpa_batch(request: CGPAPredictBatchRequest):
+    model = cgpa_model.get()
+    histories = [item.history for item in request.items]
+    predictions = model.predict_next_semester_batch(histories)
+    return [
+        {
+            "predicted_next_cgpa": prediction,
+            "growth_analysis": model.analyze_growth(prediction, history[-1] if history else 0)
+        }
+        for prediction, history in zip(predictions, histories)
+    ]
+
+@router.post("/analyze-skills/batch")
+def analyze_skills_batch(request: SkillsGapBatchRequest):
+    return skills_model.get().analyze_gap_batch([(item.current_skills, item.required_skills) for item in request.items])
+
+# Stored students: inputs come from the feature store (app/features.py) in one indexed read
+
+def _require_staff(current_user: auth.CurrentUser):
+    if current_user.role not in (models.UserRole.ADMIN, models.UserRole.FACULTY):
+        raise HTTPException(status_code=403, detail="Only admins and faculty can access student data")
+
+@router.get("/features/{student_id}")
+def get_student_features(
+    student_id: str,
+    db: Session = Depends(database.get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
+):
+    _require_staff(current_user)
+    result = features.get_student_features(db, student_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return result
+
+@router.post("/features")
+def get_features_batch(
+    request: StudentIdsRequest,
+    db: Session = Depends(database.get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
+):
+    """student id -> features; unknown ids are left out."""
+    _require_staff(current_user)
+    return features.get_features(db, request.student_ids)
+
+@router.post("/predict-risk/students")
+def predict_risk_for_students(
+    request: StudentIdsRequest,
+    db: Session = Depends(database.get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
+):
+    """student id -> risk score and level; unknown ids are left out."""
+    _require_staff(current_user)
+    ids, X = features.load_matrix(db, request.student_ids)
+    results = risk_model.get().predict_matrix(X[:, :len(FEATURES)])
+    return dict(zip(ids, results))
+
+@router.post("/match-skills")
+def match_skills(
+    request: SkillMatchRequest,
+    db: Session = Depends(database.get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
+):
+    """
+    Students institution-wide (or in one department) who best match a role's required skills,
+    ranked by proficiency-weighted coverage from the in-memory skill index (app/skills.py).
+    """
+    _require_staff(current_user)
+    # Identical concurrent queries (e.g. several staff opening the same role) share one ranking
+    key = ("match-skills", tuple(request.required_skills), request.top_k, request.department)
+    return singleflight.analytics.do(key, lambda: skills.top_candidates(db, request.required_skills, request.top_k, request.department))
+
+@router.get("/similar-students/{student_id}")
+def get_similar_students(
+    student_id: str,
+    k: int = Query(10, ge=1, le=100),
+    department: Optional[str] = None,
+    db: Session = Depends(database.get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
+):
+    """Nearest students on CGPA, growth, DNA, readiness and feedback (app/similarity.py), closest first."""
+    _require_staff(current_user)
+    result = similarity.similar_students(db, student_id, k, department)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Student not found")
     return result
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app import database, models, schemas, auth
+from app import database, models, schemas, auth, aggregates, pagination
 
 router = APIRouter(
     prefix="/staff",
@@ -13,40 +15,57 @@ router = APIRouter(
 @router.get("/my-profile", response_model=schemas.Staff)
 def get_my_profile(
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     if current_user.role != models.UserRole.FACULTY:
         raise HTTPException(status_code=403, detail="Only faculty can access this")
     
-    staff = db.query(models.Staff).filter(models.Staff.user_id == current_user.id).first()
+    staff = db.query(models.Staff).options(joinedload(models.Staff.user)).filter(models.Staff.user_id == current_user.id).first()
     if not staff:
         raise HTTPException(status_code=404, detail="Staff profile not found")
     return staff
 
 @router.get("/students", response_model=List[schemas.Student])
-def get_my_students(
+async def get_my_students(
+    response: Response,
     year: Optional[int] = None,
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None),
+    db: AsyncSession = Depends(database.get_async_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     if current_user.role != models.UserRole.FACULTY:
         raise HTTPException(status_code=403, detail="Only faculty can access this")
     
-    staff = db.query(models.Staff).filter(models.Staff.user_id == current_user.id).first()
-    if not staff:
+    department = (await db.execute(select(models.Staff.department).where(models.Staff.id == current_user.staff_id))).first()
+    if not department:
         raise HTTPException(status_code=404, detail="Staff profile not found")
     
-    query = db.query(models.Student).filter(models.Student.department == staff.department)
+    # Student.name reads the user row; async sessions can't lazy-load it, so join it in
+    query = select(models.Student).where(models.Student.department == department[0]).options(joinedload(models.Student.user))
     if year:
-        query = query.filter(models.Student.year == year)
+        query = query.where(models.Student.year == year)
     
-    return query.all()
+    if not pagination.is_paged(limit, after):
+        return (await db.execute(query)).scalars().all()
+
+    limit = limit or pagination.DEFAULT_PAGE_SIZE
+    if year:
+        total_key = ("staff_students", department[0], year)
+        total = pagination.get_cached_total(total_key)
+        if total is None:
+            total = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar()
+            pagination.set_cached_total(total_key, total)
+    else:
+        total = (await db.execute(aggregates.student_total_query(department[0]))).scalar()
+    rows = (await db.execute(pagination.paginate(query, models.Student.id, limit, after))).scalars().all()
+    return pagination.finish_page(response, rows, limit, total)
 
 @router.post("/feedback")
 def submit_feedback(
     feedback_in: schemas.FeedbackCreate,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     if current_user.role != models.UserRole.FACULTY:
         raise HTTPException(status_code=403, detail="Only faculty can submit feedback")
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 from app import database, models, schemas, auth
@@ -10,14 +12,20 @@ router = APIRouter(
 )
 
 @router.get("/profile", response_model=schemas.StudentDetail)
-def get_my_profile(
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+async def get_my_profile(
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     if current_user.role != models.UserRole.STUDENT:
         raise HTTPException(status_code=403, detail="Only students can access this")
     
-    student = db.query(models.Student).filter(models.Student.user_id == current_user.id).first()
+    # Async sessions can't lazy-load during serialization, so load everything StudentDetail reads up front
+    result = await db.execute(
+        select(models.Student)
+        .where(models.Student.user_id == current_user.id)
+        .options(*models.STUDENT_DETAIL_LOADERS)
+    )
+    student = result.scalars().first()
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
     return student
@@ -25,7 +33,7 @@ def get_my_profile(
 @router.get("/feedback", response_model=List[schemas.Feedback])
 def get_my_feedback(
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     if current_user.role != models.UserRole.STUDENT:
         raise HTTPException(status_code=403, detail="Only students can access this")
@@ -35,18 +43,20 @@ def get_my_feedback(
 
 # Todo CRUD
 @router.get("/todos", response_model=List[schemas.Todo])
-def get_todos(
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+async def get_todos(
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
-    student = db.query(models.Student).filter(models.Student.user_id == current_user.id).first()
-    return db.query(models.Todo).filter(models.Todo.student_id == student.id).all()
+    if current_user.student_id is None:
+        raise HTTPException(status_code=404, detail="Student profile not found")
+    result = await db.execute(select(models.Todo).where(models.Todo.student_id == current_user.student_id))
+    return result.scalars().all()
 
 @router.post("/todos", response_model=schemas.Todo)
 def add_todo(
     todo_in: schemas.TodoCreate,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     student = db.query(models.Student).filter(models.Student.user_id == current_user.id).first()
     new_todo = models.Todo(
@@ -64,7 +74,7 @@ def add_todo(
 def toggle_todo(
     todo_id: str,
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     todo = db.query(models.Todo).filter(models.Todo.id == todo_id).first()
     if not todo:
@@ -77,7 +87,7 @@ def toggle_todo(
 @router.get("/study-plan", response_model=List[schemas.StudyPlan])
 def get_study_plan(
     db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_active_user)
 ):
     student = db.query(models.Student).filter(models.Student.user_id == current_user.id).first()
     plan = db.query(models.StudyPlan).filter(models.StudyPlan.student_id == student.id).all()
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List
 from app import database, models, schemas, auth
+from app.routers.admin import generate_ai_insights
 
 router = APIRouter(
     prefix="/users",
@@ -9,11 +11,18 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
-    if db_user:
+async def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
+    # The sync session's queries run in the threadpool and the hash in the hashing pool, so neither
+    # holds the event loop or a threadpool thread for the other
+    if await run_in_threadpool(_email_registered, db, user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
-    
+    hashed_password = await auth.get_password_hash_async(user.password)
+    return await run_in_threadpool(_create_user, db, user, hashed_password)
+
+def _email_registered(db: Session, email: str) -> bool:
+    return db.query(models.User).filter(models.User.email == email).first() is not None
+
+def _create_user(db: Session, user: schemas.UserCreate, hashed_password: str) -> models.User:
     # Domain-based role logic
     role = models.UserRole.STUDENT
     if user.email.lower().endswith("@faculty.com"):
@@ -21,7 +30,6 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)
     elif user.email.lower() == "admin@gmail.com":
         role = models.UserRole.ADMIN
     
-    hashed_password = auth.get_password_hash(user.password)
     db_user = models.User(
         email=user.email.lower().strip(),
         hashed_password=hashed_password,
@@ -31,14 +39,17 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)
     db.commit()
     db.refresh(db_user)
     
-    # Create associated student profile if role is student
+    # Create associated student profile (with its initial AI insights) if role is student
     if role == models.UserRole.STUDENT:
         db_student = models.Student(user_id=db_user.id)
         db.add(db_student)
+        db.flush()
+        generate_ai_insights(db_student, db)
         db.commit()
         
     return db_user
 
 @router.get("/me", response_model=schemas.User)
-async def read_users_me(current_user: models.User = Depends(auth.get_current_active_user)):
-    return current_user
+def read_users_me(db: Session = Depends(database.get_db), current_user: auth.CurrentUser = Depends(auth.get_current_active_user)):
+    # The cached principal only carries auth fields, so load the full account for the profile view
+    return db.query(models.User).filter(models.User.id == current_user.id).first()
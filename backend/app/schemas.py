@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional
 from enum import Enum
+from datetime import datetime
 
 class UserRole(str, Enum):
     STUDENT = "student"
@@ -167,11 +168,22 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     email: Optional[str] = None
 
+class RiskFactor(BaseModel):
+    feature: str
+    value: float
+    contribution: float # SHAP value: how much this feature moved the risk score (log-odds for the trained model)
+
+class RiskExplanation(BaseModel):
+    model_version: Optional[str] = None
+    base_value: float
+    factors: List[RiskFactor]
+
 class StudentDetail(Student):
     user: User
     academic_records: List[AcademicRecord] = []
     ai_scores: Optional[AIScore] = None
     feedback: List[Feedback] = []
+    risk_explanation: Optional[RiskExplanation] = None # admin detail only
 
 class StaffBase(BaseModel):
     department: Optional[str] = None
@@ -284,3 +296,20 @@ class DashboardOverview(BaseModel):
     resource_opt: ResourceOptimization
     weekly_insight: str
     action_plan: DynamicActionPlan
+
+class ModelActivation(BaseModel):
+    version: str
+
+class JobRun(BaseModel):
+    id: str
+    job: str
+    status: str
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+    students_processed: int = 0
+    model_version: Optional[str] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
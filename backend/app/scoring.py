@@ -0,0 +1,127 @@
+"""
+Batch risk scoring: writes RiskModel output back to Student.risk_level and AIScore.risk_probability,
+so dashboards read stored scores instead of calling the model per request. Neither is a training
+input: the risk model learns from observed outcomes (features.iter_training_data), so stored scores
+never feed back into the next model.
+
+A run only rescores students whose feature store row changed since the last successful run started
+(new students included); a run with a different model than the last one rescores everyone. Models are
+told apart by RiskModel.cache_version: the registry version, or the content hash of an unversioned
+artifact, so retraining the default artifact in place also counts as a new model.
+Each run is recorded in job_runs with its duration.
+
+Alongside each score the job stores its top SHAP contributions (AIScore.risk_explanation), so the
+"why" on the student detail page is a column read; it is recomputed exactly when the score is.
+"""
+import json
+import logging
+from datetime import datetime
+from typing import List, Optional
+import numpy as np
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.orm import Session
+from app import models, features, aggregates, jobs
+from app.database import upsert
+from app.ai.risk_model import RiskModel, FEATURES, risk_levels
+
+RISK_JOB = "risk_scoring"
+# Factors kept per student; the model has only a few inputs, so these carry nearly all of a score
+EXPLANATION_TOP_K = 3
+
+_students = models.Student.__table__
+_scores = models.AIScore.__table__
+_features = models.StudentFeature.__table__
+
+_update_levels = (
+    update(_students)
+    .where(_students.c.id == bindparam("sid"))
+    .values(risk_level=bindparam("level"))
+)
+
+
+def build_explanations(model: RiskModel, X: np.ndarray, top_k: int = EXPLANATION_TOP_K) -> List[str]:
+    """
+    JSON explanation per row of X: the `top_k` features by absolute SHAP value, tagged with the model's
+    cache_version and the feature hash they are valid for.
+    """
+    phi = model.contributions(X)
+    top = np.argsort(-np.abs(phi[:, :-1]), axis=1, kind="stable")[:, :top_k]
+    return [
+        json.dumps({
+            "model_version": model.cache_version,
+            "feature_hash": feature_hash,
+            "base_value": round(float(row_phi[-1]), 4),
+            "factors": [
+                {"feature": FEATURES[j], "value": round(float(row[j]), 4), "contribution": round(float(row_phi[j]), 4)}
+                for j in row_top
+            ],
+        }, separators=(",", ":"))
+        for row, row_phi, row_top, feature_hash in zip(X, phi, top, features.feature_hashes(X))
+    ]
+
+
+def current_explanation(student: models.Student, model_version: str) -> Optional[dict]:
+    """
+    The student's stored explanation, or None once it is stale: computed by another model (its
+    cache_version differs from `model_version`), or the features have changed since (the next
+    scoring run replaces it).
+    """
+    scores, row = student.ai_scores, student.features
+    if scores is None or not scores.risk_explanation or row is None:
+        return None
+    explanation = json.loads(scores.risk_explanation)
+    if explanation.get("model_version") != model_version:
+        return None
+    if explanation.get("feature_hash") != features.feature_hashes(features.feature_matrix([row])[:, :len(FEATURES)])[0]:
+        return None
+    return explanation
+
+
+def score_students(db: Session, model: RiskModel, since: Optional[datetime] = None, chunk_size: int = 10000) -> int:
+    """
+    Score students (all, or those whose features changed at or after `since`) in chunks of
+    `chunk_size`: one keyset-paginated read, one vectorized prediction and explanation, and two bulk
+    writes per chunk, committed chunk by chunk. Returns the number of students scored.
+
+    Bypasses the ORM, so the caller rebuilds the department aggregates afterwards.
+    """
+    stmt = select(_features).order_by(_features.c.student_id).limit(chunk_size)
+    if since is not None:
+        stmt = stmt.where(_features.c.updated_at >= since)
+    scored, last_id = 0, None
+    while True:
+        page = stmt if last_id is None else stmt.where(_features.c.student_id > last_id)
+        rows = db.execute(page).all()
+        if not rows:
+            return scored
+        ids = [row.student_id for row in rows]
+        X = features.feature_matrix(rows)[:, :len(FEATURES)]
+        probabilities = model.predict_proba(X)
+        levels = risk_levels(probabilities)
+        db.execute(_update_levels, [{"sid": sid, "level": level} for sid, level in zip(ids, levels.tolist())])
+        upsert(db, _scores, [
+            {"student_id": sid, "risk_probability": round(p, 4), "risk_explanation": explanation}
+            for sid, p, explanation in zip(ids, probabilities.tolist(), build_explanations(model, X))
+        ], ["student_id"], ["risk_probability", "risk_explanation"])
+        db.commit()
+        scored += len(ids)
+        last_id = ids[-1]
+
+
+def run_risk_scoring(db: Session, model: RiskModel, full: bool = False, chunk_size: int = 10000) -> models.JobRun:
+    """
+    One recorded run of the risk scoring job: incremental from the last successful run unless `full`
+    (or the model version changed), then the dashboard aggregates are rebuilt.
+    """
+    previous = jobs.last_run(db, RISK_JOB)
+    if previous is None or previous.model_version != model.cache_version:
+        full = True
+    with jobs.recorded_run(db, RISK_JOB, model.cache_version) as run:
+        run.students_processed = score_students(db, model, None if full else previous.started_at, chunk_size)
+        if run.students_processed:
+            aggregates.rebuild(db)
+    logging.info(
+        f"Risk scoring: {run.students_processed} students ({'full' if full else 'incremental'}, "
+        f"model {model.cache_version}) in {run.duration_seconds}s"
+    )
+    return run
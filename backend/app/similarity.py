@@ -0,0 +1,73 @@
+"""
+"Students most similar to X" for peer mentoring, from the nearest-neighbour index in
+app/ai/similarity_model.py. The index is built by build_similarity_index.py (scheduled; it only
+rebuilds departments with changed rows), or at startup or on the first query when none exists yet.
+API processes load the persisted file and pick up a rebuilt one on their next query, so results are
+as fresh as the last build.
+"""
+import threading
+from typing import Dict, List, Optional
+from sqlalchemy import select, case, func
+from sqlalchemy.orm import Session
+from app import models, config
+from app.skills import attach_student_names
+from app.ai.similarity_model import SimilarStudentsModel
+
+similarity_model = SimilarStudentsModel(config.settings.similarity_index_path)
+
+_students = models.Student.__table__
+_features = models.StudentFeature.__table__
+
+# One first build per process when queries arrive before any index exists
+_build_lock = threading.Lock()
+
+
+def vectors_query():
+    """(id, department, *SimilarStudentsModel.FEATURE_FIELDS) for every student."""
+    # Average overall feedback rating on the same 0-5 scale as features.feature_matrix()
+    feedback_score = case((_features.c.feedback_count > 0, _features.c.rating_sum / _features.c.feedback_count / 2), else_=0.0)
+    return (
+        select(
+            _students.c.id,
+            _students.c.department,
+            *[func.coalesce(_students.c[name], 0.0) for name in SimilarStudentsModel.FEATURE_FIELDS[:-1]],
+            func.coalesce(feedback_score, 0.0),
+        )
+        .outerjoin(_features, _features.c.student_id == _students.c.id)
+    )
+
+
+def build(db: Session, full: bool = False) -> List[str]:
+    """Refresh the persisted index from the database; returns the departments whose tree was rebuilt."""
+    similarity_model.load()
+    rows = db.execute(vectors_query()).all()
+    if full or not similarity_model.is_fitted:
+        similarity_model.fit(rows)
+        return sorted(similarity_model.departments)
+    return similarity_model.update(rows)
+
+
+def ensure_built(db: Session):
+    """Build the index once for databases that have none yet."""
+    similarity_model.load()
+    if not similarity_model.is_fitted and db.execute(select(_students.c.id).limit(1)).first() is not None:
+        build(db, full=True)
+
+
+def similar_students(db: Session, student_id: str, k: int = 10, department: Optional[str] = None) -> Optional[List[Dict]]:
+    """The `k` students nearest to `student_id` (optionally within `department`); None for unknown ids."""
+    row = db.execute(vectors_query().where(_students.c.id == student_id)).first()
+    if row is None:
+        return None
+    similarity_model.load()
+    if not similarity_model.is_fitted:
+        # Fresh install: students exist now but none did at startup
+        with _build_lock:
+            similarity_model.load()
+            if not similarity_model.is_fitted:
+                build(db, full=True)
+    matches = [
+        {"student_id": sid, "department": dept or None, "distance": round(distance, 4)}
+        for sid, dept, distance in similarity_model.query(row[2:], k, department, exclude=student_id)
+    ]
+    return attach_student_names(db, matches)
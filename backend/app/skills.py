@@ -0,0 +1,102 @@
+"""
+The process-wide skill index (app/ai/skill_index.py), kept in step with the skills table.
+
+The first query builds it from the skills table; later queries refresh it first, re-reading only
+students whose student_features row changed since the previous refresh. Skill writes and department
+changes bump that row, so this works across processes. Deleted students have no row left to bump:
+results skip students that no longer exist, and the index is rebuilt in full every
+skill_index_rebuild_seconds to drop them.
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+from app import models, config
+from app.ai.skill_index import SkillIndex
+
+# Re-read window before the previous refresh, covering writes that committed while it ran and
+# second-resolution timestamps from features.rebuild()
+REFRESH_OVERLAP = timedelta(seconds=2)
+
+skill_index = SkillIndex()
+
+_lock = threading.Lock()
+_refreshed_at: Optional[datetime] = None
+_built_at: Optional[datetime] = None
+
+_skills = models.Skill.__table__
+_students = models.Student.__table__
+_features = models.StudentFeature.__table__
+
+
+@event.listens_for(models.Student, "after_update")
+def _department_changed(mapper, connection, target):
+    # The index filters by department, so every process must re-read this student
+    if inspect(target).attrs.department.history.has_changes():
+        connection.execute(
+            update(_features).where(_features.c.student_id == target.id).values(updated_at=datetime.now(timezone.utc))
+        )
+
+
+def _skill_rows(student_ids=None):
+    stmt = (
+        select(_skills.c.student_id, _students.c.department, _skills.c.skill_name, _skills.c.proficiency_level)
+        .join(_students, _students.c.id == _skills.c.student_id)
+    )
+    if student_ids is not None:
+        stmt = stmt.where(_skills.c.student_id.in_(student_ids))
+    return stmt
+
+
+def _refresh(db: Session):
+    global _refreshed_at, _built_at
+    started = datetime.now(timezone.utc)
+    if _built_at is None or (started - _built_at).total_seconds() >= config.settings.skill_index_rebuild_seconds:
+        skill_index.build(db.execute(_skill_rows()))
+        _built_at = started
+    else:
+        student_ids = db.execute(
+            select(_features.c.student_id).where(_features.c.updated_at >= _refreshed_at - REFRESH_OVERLAP)
+        ).scalars().all()
+        for start in range(0, len(student_ids), 10000):
+            chunk = student_ids[start:start + 10000]
+            skill_index.update(chunk, db.execute(_skill_rows(chunk)).all())
+    _refreshed_at = started
+
+
+def refresh(db: Session):
+    """Build the index on first use (and every skill_index_rebuild_seconds), otherwise apply what changed since the last refresh."""
+    with _lock:
+        _refresh(db)
+
+
+def top_candidates(db: Session, required_skills: List[str], k: int = 20, department: Optional[str] = None) -> List[Dict]:
+    """skill_index.top_k() on a fresh index, with each student's name and roll number attached."""
+    # Refresh and query under one lock: a concurrent refresh would swap blocks mid-query
+    with _lock:
+        _refresh(db)
+        matches = skill_index.top_k(required_skills, k, department)
+    return attach_student_names(db, matches)
+
+
+def attach_student_names(db: Session, matches: List[Dict]) -> List[Dict]:
+    """
+    Add "name" and "roll_number" to result dicts keyed by "student_id", in one query. Matches for
+    students deleted since the index was built are dropped.
+    """
+    if not matches:
+        return matches
+    students = {
+        row.id: row for row in db.execute(
+            select(_students.c.id, _students.c.roll_number, models.User.full_name)
+            .join(models.User, models.User.id == _students.c.user_id)
+            .where(_students.c.id.in_([m["student_id"] for m in matches]))
+        )
+    }
+    matches = [match for match in matches if match["student_id"] in students]
+    for match in matches:
+        row = students[match["student_id"]]
+        match["name"] = row.full_name
+        match["roll_number"] = row.roll_number
+    return matches
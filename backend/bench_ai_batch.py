@@ -0,0 +1,72 @@
+"""
+Per-item cost of the /ai scoring endpoints: N single-item calls versus one /batch call with N items,
+for N = 1, 100 and 10k, over HTTP (in-process TestClient, no database needed).
+Single-item calls are timed on at most --single-sample items and reported per item.
+
+    python bench_ai_batch.py [--sizes 1 100 10000] [--single-sample 500]
+"""
+import argparse
+import random
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.routers import ai
+
+def risk_item(rng):
+    return {
+        "attendance_percentage": rng.uniform(60, 100),
+        "cgpa_trend": rng.uniform(-1, 1),
+        "failed_subjects": rng.randint(0, 4),
+        "feedback_score": rng.uniform(1, 5)
+    }
+
+def cgpa_item(rng):
+    return {"history": [round(rng.uniform(5, 10), 2) for _ in range(rng.randint(1, 8))]}
+
+def skills_item(rng):
+    skills = ["Python", "SQL", "Docker", "React", "Statistics", "Linux", "Git", "AWS"]
+    return {
+        "current_skills": [{"name": name, "level": rng.randint(1, 5)} for name in rng.sample(skills, 4)],
+        "required_skills": rng.sample(skills, 5)
+    }
+
+ENDPOINTS = [
+    ("/ai/predict-risk", risk_item),
+    ("/ai/predict-cgpa", cgpa_item),
+    ("/ai/analyze-skills", skills_item),
+]
+
+def per_item_us(client, path, items, single_sample):
+    sample = items[:single_sample]
+    client.post(path, json=items[0]) # warm-up
+    start = time.perf_counter()
+    for item in sample:
+        assert client.post(path, json=item).status_code == 200
+    single = (time.perf_counter() - start) / len(sample)
+
+    start = time.perf_counter()
+    response = client.post(f"{path}/batch", json={"items": items})
+    batch = (time.perf_counter() - start) / len(items)
+    assert response.status_code == 200 and len(response.json()) == len(items)
+    return single * 1e6, batch * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--single-sample", type=int, default=500)
+    args = parser.parse_args()
+
+    app = FastAPI()
+    app.include_router(ai.router)
+    client = TestClient(app)
+    rng = random.Random(42)
+
+    print(f"{'endpoint':<20} {'batch':>6} {'single us/item':>15} {'batch us/item':>14} {'speedup':>8}")
+    for path, make_item in ENDPOINTS:
+        for size in args.sizes:
+            items = [make_item(rng) for _ in range(size)]
+            single, batch = per_item_us(client, path, items, args.single_sample)
+            print(f"{path:<20} {size:>6} {single:>15.1f} {batch:>14.1f} {single / batch:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Whole-institution CGPA forecast timing on the configured database, stage by stage: the per-semester
+GPA query, the vectorized fit, and the bulk write - next to the per-student predict_next_semester
+loop it replaces, timed on --loop-sample students. Writes cgpa_prediction like forecast_cgpa.py.
+
+    python seed_db.py --scale 100000 && python bench_cgpa_forecast.py [--department CSE] [--year 2]
+"""
+import argparse
+import time
+import numpy as np
+from app import forecasting
+from app.database import SessionLocal
+from app.ai.cgpa_model import CGPAModel
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--department")
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--loop-sample", type=int, default=10000, help="students timed through the per-student loop")
+    args = parser.parse_args()
+
+    model = CGPAModel()
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        ids, Y, lengths = forecasting.load_series(db, args.department, args.year)
+        load = time.perf_counter() - start
+        if not len(ids):
+            print("No academic records to forecast.")
+            return
+
+        start = time.perf_counter()
+        predictions = model.predict_next_matrix(Y, lengths)
+        fit = time.perf_counter() - start
+
+        sample = min(args.loop_sample, len(ids))
+        histories = [Y[i, :lengths[i]].tolist() for i in range(sample)]
+        start = time.perf_counter()
+        looped = [model.predict_next_semester(history) for history in histories]
+        loop = (time.perf_counter() - start) / sample * len(ids)
+        assert np.allclose(looped, np.round(predictions[:sample], 2), atol=0.011)
+
+        total = time.perf_counter()
+        written = forecasting.forecast_cgpa(db, model, args.department, args.year)
+        end_to_end = time.perf_counter() - total
+
+        print(f"{len(ids)} students, {int(lengths.sum())} semester GPAs (up to {Y.shape[1]} per student)")
+        print(f"{'GPA series query':<28}{load:>9.3f} s")
+        print(f"{'vectorized fit':<28}{fit * 1000:>9.1f} ms")
+        print(f"{'per-student loop (est.)':<28}{loop:>9.3f} s   ({loop / fit:,.0f}x the vectorized fit)")
+        print(f"{'end-to-end incl. writes':<28}{end_to_end:>9.3f} s   ({written} cgpa_prediction rows)")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
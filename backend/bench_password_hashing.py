@@ -0,0 +1,39 @@
+"""
+Login throughput benchmark: verifies N passwords concurrently through auth.verify_password_async
+with 1, 2, 4, ... worker processes (up to the core count) and reports verifications per second.
+
+    python bench_password_hashing.py [--logins 32]
+"""
+import argparse
+import asyncio
+import os
+import time
+from app import auth
+
+async def run_logins(count: int, hashed: str):
+    results = await asyncio.gather(*[auth.verify_password_async("password123", hashed) for _ in range(count)])
+    assert all(results)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=32)
+    args = parser.parse_args()
+
+    hashed = auth.pwd_context.hash("password123")
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, cores} | {n for n in (2, 4, 8, 16, 32) if n < cores})
+
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>8} {'logins/s':>9} {'speedup':>8}")
+    for workers in worker_counts:
+        auth.start_hash_pool(workers)
+        start = time.perf_counter()
+        asyncio.run(run_logins(args.logins, hashed))
+        elapsed = time.perf_counter() - start
+        rate = args.logins / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>8} {elapsed:>8.2f} {rate:>9.2f} {rate / baseline:>7.2f}x")
+    auth.shutdown_hash_pool()
+
+if __name__ == "__main__":
+    main()
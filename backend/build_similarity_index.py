@@ -0,0 +1,33 @@
+"""
+Build or refresh the "similar students" nearest-neighbour index (app/similarity.py).
+
+By default only departments whose students or metrics changed since the last build get their tree
+rebuilt; --full also refits the normalization. Running API processes pick up the new file on their
+next query. Schedule it like score_risk.py, e.g. hourly:
+
+    0 * * * * cd /app && python build_similarity_index.py >> similarity_index.log 2>&1
+"""
+import argparse
+import logging
+import time
+from app import migrations, similarity
+from app.database import SessionLocal, engine
+
+logging.basicConfig(level=logging.INFO)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="rebuild every department and refit the normalization")
+    args = parser.parse_args()
+
+    migrations.upgrade(engine)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        rebuilt = similarity.build(db, full=args.full)
+        logging.info(f"Rebuilt {len(rebuilt)} department tree(s) {rebuilt} in {time.perf_counter() - started:.2f}s")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,129 @@
-from app.database import SessionLocal
-from app import models
-from app.routers.admin import _generate_ai_insights
+"""
+Regenerate AI insights (career compass + learning analytics) for every student, or one department/year.
+
+Students are streamed in id order and split into chunks that a process pool turns into plain AIScore
+dicts; the main process writes them with bulk UPSERTs, one commit per batch. After each commit the
+last processed id is checkpointed, so an interrupted run continues where it stopped with --resume.
+
+    python bulk_generate_ai.py [--department CSE] [--year 2] [--workers 4] [--chunk-size 1000] [--resume]
+"""
+import argparse
+import json
 import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from sqlalchemy import select, func
+from app.database import SessionLocal, upsert
+from app import models
+from app.ai.insights_model import InsightsModel
 
 logging.basicConfig(level=logging.INFO)
-db = SessionLocal()
-try:
-    students = db.query(models.Student).all()
-    logging.info(f"Generating insights for {len(students)} students...")
-    for s in students:
-        _generate_ai_insights(s, db)
-    logging.info("Bulk AI insight generation complete.")
-finally:
-    db.close()
+
+CHECKPOINT_PATH = "bulk_ai_checkpoint.json"
+# Existing AIScore rows only get missing suggestions filled in; their scores belong to the scoring jobs
+UPDATE_COLUMNS = ("career_suggestions", "recommended_courses")
+# Chunks submitted but not yet written, per worker: keeps workers busy without reading the table ahead
+IN_FLIGHT_PER_WORKER = 2
+
+_insights_model = InsightsModel()
+
+def _build_chunk(chunk):
+    """Worker: [(id, department, cgpa)] -> [AIScore row dict]."""
+    return [{"student_id": sid, **_insights_model.generate(sid, dept, cgpa)} for sid, dept, cgpa in chunk]
+
+def _filtered(stmt, args):
+    if args.department:
+        stmt = stmt.where(models.Student.department == args.department)
+    if args.year:
+        stmt = stmt.where(models.Student.year == args.year)
+    return stmt
+
+def _load_checkpoint(args):
+    if not (args.resume and os.path.exists(args.checkpoint)):
+        return None
+    with open(args.checkpoint) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("filters") != {"department": args.department, "year": args.year}:
+        logging.warning("Checkpoint was written for different filters; starting from the beginning.")
+        return None
+    return checkpoint["last_id"]
+
+def _save_checkpoint(args, last_id):
+    tmp_path = f"{args.checkpoint}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"filters": {"department": args.department, "year": args.year}, "last_id": last_id}, f)
+    os.replace(tmp_path, args.checkpoint)
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := [tuple(row) for row in islice(rows, size)]:
+        yield chunk
+
+def _bounded_map(pool, fn, items, window):
+    """pool.map() that submits at most `window` items ahead of the results consumed, yielding in order."""
+    in_flight = deque()
+    for item in items:
+        in_flight.append(pool.submit(fn, item))
+        if len(in_flight) >= window:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+def regenerate(args):
+    read_db, write_db = SessionLocal(), SessionLocal()
+    try:
+        last_id = _load_checkpoint(args)
+        keys = _filtered(select(models.Student.id, models.Student.department, models.Student.current_cgpa), args)
+        if last_id:
+            keys = keys.where(models.Student.id > last_id)
+            logging.info(f"Resuming after student {last_id}")
+        total = read_db.execute(_filtered(select(func.count(models.Student.id)), args).where(models.Student.id > (last_id or ""))).scalar()
+        logging.info(f"Regenerating insights for {total} students with {args.workers} workers...")
+
+        rows = read_db.execute(keys.order_by(models.Student.id).execution_options(yield_per=args.chunk_size))
+        done, pending, started = 0, [], time.perf_counter()
+        # spawn rather than fork: this process holds open database cursors
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            # Results come back in submission (= id) order, so a checkpoint never skips unwritten students
+            chunks = _chunks(rows, args.chunk_size)
+            for built in _bounded_map(pool, _build_chunk, chunks, args.workers * IN_FLIGHT_PER_WORKER):
+                pending.extend(built)
+                if len(pending) >= args.batch_size:
+                    done += _flush(write_db, args, pending)
+                    pending = []
+                    rate = done / (time.perf_counter() - started)
+                    logging.info(f"{done}/{total} students ({rate:.0f}/s)")
+            done += _flush(write_db, args, pending)
+
+        if os.path.exists(args.checkpoint):
+            os.remove(args.checkpoint)
+        logging.info(f"Bulk AI insight generation complete: {done} students in {time.perf_counter() - started:.1f}s.")
+    finally:
+        read_db.close()
+        write_db.close()
+
+def _flush(db, args, rows):
+    if not rows:
+        return 0
+    upsert(db, models.AIScore.__table__, rows, index_elements=["student_id"], update_columns=UPDATE_COLUMNS, only_missing=True)
+    db.commit()
+    _save_checkpoint(args, rows[-1]["student_id"])
+    return len(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--department")
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="students per worker task")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per UPSERT/commit")
+    parser.add_argument("--resume", action="store_true", help="continue after the last checkpointed student")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    regenerate(parser.parse_args())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Forecast next-semester CGPA for a whole cohort from academic_records and store it in
+AIScore.cgpa_prediction (see app/forecasting.py). Runs are recorded in job_runs.
+
+    python forecast_cgpa.py [--department CSE] [--year 2]
+"""
+import argparse
+import logging
+from app import config, migrations, forecasting
+from app.database import SessionLocal, engine
+from app.ai.registry import ModelRegistry, ModelSlot
+from app.ai.cgpa_model import CGPAModel
+
+logging.basicConfig(level=logging.INFO)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--department")
+    parser.add_argument("--year", type=int)
+    args = parser.parse_args()
+
+    migrations.upgrade(engine)
+    model = ModelSlot(ModelRegistry(config.settings.model_registry_dir), "cgpa", CGPAModel).get()
+    db = SessionLocal()
+    try:
+        forecasting.run_cgpa_forecast(db, model, args.department, args.year)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Refit the performance cluster model (app/clusters.py) on current student metrics and relabel every
+student.
+
+By default the centroids are refined with a partial fit and cluster names keep their ranks; --full
+fits from scratch and re-ranks them. The API only predicts with the saved model and picks up the new
+file on its next write. Schedule it off-peak, e.g. nightly:
+
+    30 2 * * * cd /app && python refit_clusters.py >> refit_clusters.log 2>&1
+"""
+import argparse
+import logging
+import time
+from app import migrations, clusters
+from app.database import SessionLocal, engine
+
+logging.basicConfig(level=logging.INFO)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="fit from scratch and re-rank the clusters")
+    args = parser.parse_args()
+
+    migrations.upgrade(engine)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        labelled = clusters.refit(db, full=args.full)
+        logging.info(f"Refit clusters{' (full)' if args.full else ''}: {labelled} students relabelled in {time.perf_counter() - started:.2f}s")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Nightly risk scoring: recompute Student.risk_level and AIScore.risk_probability with the active
+risk model for every student whose inputs changed since the last run (see app/scoring.py).
+
+    python score_risk.py [--full] [--chunk-size 10000] [--nthread 4]
+
+Schedule it outside the API processes, e.g. with cron:
+
+    30 2 * * * cd /app && python score_risk.py >> score_risk.log 2>&1
+"""
+import argparse
+import logging
+import os
+from app import config, migrations, scoring
+from app.database import SessionLocal, engine
+from app.ai.registry import ModelRegistry, ModelSlot
+from app.ai.risk_model import RiskModel
+
+logging.basicConfig(level=logging.INFO)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="rescore every student, not just changed ones")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="students per prediction / write batch")
+    parser.add_argument("--nthread", type=int, default=os.cpu_count() or 1, help="prediction threads")
+    args = parser.parse_args()
+
+    migrations.upgrade(engine)
+    # Same model the API serves: the registry's current version, else the configured default artifact
+    slot = ModelSlot(ModelRegistry(config.settings.model_registry_dir), "risk", RiskModel,
+                     default_path=config.settings.risk_model_path, nthread=args.nthread)
+    db = SessionLocal()
+    try:
+        scoring.run_risk_scoring(db, slot.get(), full=args.full, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
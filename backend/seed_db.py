@@ -1,16 +1,142 @@
+import argparse
+import csv
+import io
 import random
 import logging
+import time
+import uuid
+import numpy as np
+from sqlalchemy import insert
 from app.database import SessionLocal, engine
-from app import models, auth as auth_utils
+from app import models, aggregates, clusters, features, auth as auth_utils # aggregates, features: register write listeners
 
 logging.basicConfig(level=logging.INFO)
 
+FIRST_NAMES = ["Ashwin", "Priya", "Rahul", "Ananya", "Sanjay", "Deepika", "Vikram", "Meera", "Arjun", "Kavya", "Rohan", "Sneha", "Karthik", "Divya", "Vijay", "Anita", "Suraj", "Lakshmi", "Manoj", "Harini", "Sharmila", "Kavitha", "Rajesh", "Suresh"]
+LAST_NAMES = ["N", "G", "S", "R", "K", "M", "A", "V", "P", "D"]
+DEPARTMENTS = ["AIML", "AGRI", "EEE", "EIE", "ECE", "BT", "BME", "CIVIL", "IT", "MECH", "MECHATRONICS", "CSE", "FT", "FD", "AIDS"]
+BATCH_MAP = {1: "25", 2: "24", 3: "23", 4: "22"}
+BLOOD_GROUPS = ["A+", "A-", "B+", "B-", "O+", "O-", "AB+", "AB-"]
+GRADES = ["O", "A+", "A", "B+", "B"]
+SEMESTERS = 5
+
+# Scale mode: one password per first name, hashed once up front instead of once per student
+SCALE_PASSWORD_TEMPLATE = "{first_name}#2025!"
+SCALE_CHUNK_SIZE = 20000
+# Seeding is reproducible by default; pass --seed for a different data set
+DEFAULT_SEED = 42
+
 def generate_random_name():
-    first_names = ["Ashwin", "Priya", "Rahul", "Ananya", "Sanjay", "Deepika", "Vikram", "Meera", "Arjun", "Kavya", "Rohan", "Sneha", "Karthik", "Divya", "Vijay", "Anita", "Suraj", "Lakshmi", "Manoj", "Harini", "Sharmila", "Kavitha", "Rajesh", "Suresh"]
-    last_names = ["N", "G", "S", "R", "K", "M", "A", "V", "P", "D"]
-    return random.choice(first_names), random.choice(last_names)
+    return random.choice(FIRST_NAMES), random.choice(LAST_NAMES)
+
+def _uuids(rng, n):
+    raw = rng.bytes(16 * n)
+    return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * n, 16)]
+
+def _copy_value(value):
+    # SQLAlchemy's Enum type stores member names; None becomes an empty (NULL) CSV field
+    return value.name if isinstance(value, models.UserRole) else value
+
+def _bulk_insert(db, table, rows):
+    """Multi-row INSERT, or COPY ... FROM STDIN on PostgreSQL, inside the session's transaction."""
+    if not rows:
+        return
+    if db.get_bind().dialect.name != "postgresql":
+        db.execute(insert(table), rows)
+        return
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[column]) for column in columns])
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+def _seed_students_at_scale(db, total, seed):
+    """
+    Load `total` synthetic students (with users, academic records and AI scores) in chunks:
+    every column is drawn as a NumPy array from one seeded generator and written with bulk inserts,
+    bypassing the ORM. Passwords follow SCALE_PASSWORD_TEMPLATE, so only one hash per first name is computed.
+    """
+    rng = np.random.default_rng(seed)
+    passwords = [SCALE_PASSWORD_TEMPLATE.format(first_name=name) for name in FIRST_NAMES]
+    hashes = auth_utils.get_password_hashes(passwords)
+    started = time.perf_counter()
 
-def seed_db():
+    for offset in range(0, total, SCALE_CHUNK_SIZE):
+        n = min(SCALE_CHUNK_SIZE, total - offset)
+        user_ids, student_ids, record_ids = _uuids(rng, n), _uuids(rng, n), _uuids(rng, n * SEMESTERS)
+        first = rng.integers(0, len(FIRST_NAMES), n).tolist()
+        last = rng.integers(0, len(LAST_NAMES), n).tolist()
+        dept = rng.integers(0, len(DEPARTMENTS), n).tolist()
+        year = rng.integers(1, 5, n).tolist()
+        month, day = rng.integers(1, 13, n).tolist(), rng.integers(1, 29, n).tolist()
+        blood = rng.integers(0, len(BLOOD_GROUPS), n).tolist()
+        parent_phone, personal_phone = rng.integers(6000000000, 10000000000, (2, n)).tolist()
+        email_suffix = rng.integers(10, 100, n).tolist()
+        cgpa = np.round(rng.uniform(6.5, 9.5, n), 2)
+        dna, growth, readiness = rng.uniform(70, 95, n).tolist(), rng.uniform(0.5, 5.0, n).tolist(), rng.uniform(60, 90, n).tolist()
+        risk = np.where(rng.random(n) < 0.75, "Low", "Medium").tolist()
+
+        users, students = [], []
+        for i in range(n):
+            serial = offset + i + 1
+            first_name, last_initial, department = FIRST_NAMES[first[i]], LAST_NAMES[last[i]], DEPARTMENTS[dept[i]]
+            batch = BATCH_MAP[year[i]]
+            roll_number = f"7376{batch}{department}{year[i]}{serial:07d}"
+            email = f"{first_name.lower()}.{last_initial.lower()}{serial}.{department.lower()}{batch}@gmail.com"
+            users.append({
+                "id": user_ids[i], "email": email, "full_name": f"{first_name} {last_initial}",
+                "institutional_email": email, "hashed_password": hashes[first[i]], "plain_password": passwords[first[i]],
+                "role": models.UserRole.STUDENT, "is_active": True
+            })
+            students.append({
+                "id": student_ids[i], "user_id": user_ids[i], "roll_number": roll_number,
+                "department": department, "year": year[i],
+                "dob": f"{2007 - year[i]}-{month[i]:02d}-{day[i]:02d}", "blood_group": BLOOD_GROUPS[blood[i]],
+                "parent_phone": f"+91{parent_phone[i]}", "personal_phone": f"+91{personal_phone[i]}",
+                "personal_email": f"{first_name.lower()}{email_suffix[i]}@gmail.com",
+                "current_cgpa": cgpa[i].item(), "academic_dna_score": dna[i], "growth_index": growth[i],
+                "risk_level": risk[i], "career_readiness_score": readiness[i]
+            })
+
+        m = n * SEMESTERS
+        record_students = np.repeat(np.array(student_ids, dtype=object), SEMESTERS).tolist()
+        semester = np.tile(np.arange(1, SEMESTERS + 1), n).tolist()
+        subject = rng.integers(1, 6, m).tolist()
+        internal, external = rng.uniform(15, 20, m).tolist(), rng.uniform(50, 80, m).tolist()
+        grade = rng.integers(0, len(GRADES), m).tolist()
+        attendance = rng.uniform(75, 100, m).tolist()
+        records = [{
+            "id": record_ids[j], "student_id": record_students[j], "semester": semester[j],
+            "subject": f"Subject {semester[j]}.{subject[j]}", "internal_marks": internal[j], "external_marks": external[j],
+            "grade": GRADES[grade[j]], "attendance_percentage": attendance[j]
+        } for j in range(m)]
+
+        consistency, volatility = rng.uniform(0.7, 0.95, n).tolist(), rng.uniform(0.05, 0.15, n).tolist()
+        cgpa_prediction = np.round(cgpa + rng.uniform(-0.2, 0.5, n), 2).tolist()
+        risk_probability, skill_gap = rng.uniform(0.01, 0.1, n).tolist(), rng.uniform(60, 85, n).tolist()
+        ai_scores = [{
+            "student_id": student_ids[i], "consistency_index": consistency[i], "performance_volatility": volatility[i],
+            "cgpa_prediction": cgpa_prediction[i], "risk_probability": risk_probability[i], "skill_gap_score": skill_gap[i]
+        } for i in range(n)]
+
+        _bulk_insert(db, models.User.__table__, users)
+        _bulk_insert(db, models.Student.__table__, students)
+        _bulk_insert(db, models.AcademicRecord.__table__, records)
+        _bulk_insert(db, models.AIScore.__table__, ai_scores)
+        db.commit()
+        done = offset + n
+        logging.info(f"Seeded {done}/{total} students ({done / (time.perf_counter() - started):.0f}/s)")
+
+def seed_db(scale=None, seed=DEFAULT_SEED):
+    """Recreate the schema and seed it: the fixed 3600-student demo set, or `scale` synthetic students."""
+    if seed is not None:
+        random.seed(seed)
     # Ensure tables are dropped and recreated for a clean start
     logging.info("Recreating all tables for expanded metadata...")
     models.Base.metadata.drop_all(bind=engine)
@@ -32,7 +158,7 @@ def seed_db():
         db.add(admin_user)
         db.commit()
 
-        departments = ["AIML", "AGRI", "EEE", "EIE", "ECE", "BT", "BME", "CIVIL", "IT", "MECH", "MECHATRONICS", "CSE", "FT", "FD", "AIDS"]
+        departments = DEPARTMENTS
         common_hashed_pw = auth_utils.get_password_hash("password123")
         used_emails = set()
 
@@ -55,12 +181,14 @@ def seed_db():
             logging.info(f"Seeding Staff for {dept}...")
             # Randomly pick between 10 and 15 staff
             staff_count = random.randint(10, 15)
+            # Distinct IDs per department, since emails and staff IDs are built from them
+            staff_ids = random.sample(range(100, 1000), staff_count)
             for i in range(staff_count):
                 first_name, last_initial = generate_random_name()
                 full_name = f"{first_name} {last_initial}"
                 
                 # Staff Email Logic: {Name}{Dept}{ID}@gmail.com
-                random_id = random.randint(100, 999)
+                random_id = staff_ids[i]
                 inst_email = f"{first_name}{dept}{random_id}@gmail.com".lower()
                 
                 user = models.User(
@@ -94,11 +222,21 @@ def seed_db():
                 db.add(staff)
             db.commit()
 
+        if scale:
+            logging.info(f"Starting bulk seeding of {scale} students...")
+            _seed_students_at_scale(db, scale, seed)
+            # The bulk inserts skip the ORM events that maintain these
+            aggregates.rebuild(db)
+            features.rebuild(db)
+            clusters.ensure_labels(db)
+            logging.info("Successfully seeded all staff and students.")
+            return
+
         # 3. Seed Students (3600 students)
         logging.info("Starting seeding of 3600 students...")
         years = [1, 2, 3, 4]
-        batch_map = {1: "25", 2: "24", 3: "23", 4: "22"}
-        blood_groups = ["A+", "A-", "B+", "B-", "O+", "O-", "AB+", "AB-"]
+        batch_map = BATCH_MAP
+        blood_groups = BLOOD_GROUPS
 
         for dept in departments:
             logging.info(f"Seeding Students for {dept}...")
@@ -178,6 +316,7 @@ def seed_db():
                     db.add(ai_score)
 
                 db.commit()
+        clusters.ensure_labels(db)
         logging.info("Successfully seeded all staff and students.")
     except Exception as e:
         db.rollback()
@@ -186,4 +325,8 @@ def seed_db():
         db.close()
 
 if __name__ == "__main__":
-    seed_db()
+    parser = argparse.ArgumentParser(description="Recreate and seed the database.")
+    parser.add_argument("--scale", type=int, help="bulk-generate this many students (e.g. 100000) instead of the demo set")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="random seed for reproducible data (default %(default)s)")
+    args = parser.parse_args()
+    seed_db(scale=args.scale, seed=args.seed)
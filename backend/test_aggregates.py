@@ -0,0 +1,91 @@
+"""
+Invariant check for the incrementally maintained dashboard aggregates: after ORM inserts, updates,
+department moves and deletes, department_aggregates must equal what rebuild() computes from scratch.
+
+Runs against a throwaway SQLite database:
+    python -m pytest test_aggregates.py    or    python test_aggregates.py
+"""
+import math
+import os
+import random
+import tempfile
+
+# Before any app import: app.database builds its engines from DATABASE_URL when imported
+DB_PATH = os.path.join(tempfile.mkdtemp(), "aggregates.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from app import database, models, aggregates
+
+DEPARTMENTS = ["CSE", "ECE", "MECH", None]
+RISK_LEVELS = ["Low", "Medium", "High", None]
+
+def _session():
+    engine = database.create_engine_from_settings(f"sqlite:///{DB_PATH}")
+    models.Base.metadata.create_all(bind=engine)
+    return database.sessionmaker(autoflush=False, bind=engine)()
+
+def _snapshot(db):
+    rows = db.query(models.DepartmentAggregate).all()
+    return {
+        row.department: {col: getattr(row, col) for col in aggregates._contribution({})[1]}
+        for row in rows if row.student_count
+    }
+
+def _assert_matches_rebuild(db):
+    incremental = _snapshot(db)
+    aggregates.rebuild(db)
+    rebuilt = _snapshot(db)
+    assert incremental.keys() == rebuilt.keys()
+    for department, expected in rebuilt.items():
+        for col, value in expected.items():
+            assert math.isclose(incremental[department][col], value, abs_tol=1e-6), (department, col, incremental[department][col], value)
+
+def _random_values(rnd):
+    return {
+        "department": rnd.choice(DEPARTMENTS),
+        "current_cgpa": round(rnd.uniform(5, 9.8), 2),
+        "growth_index": rnd.uniform(0.5, 5),
+        "academic_dna_score": rnd.uniform(60, 95),
+        "career_readiness_score": rnd.uniform(50, 90),
+        "risk_level": rnd.choice(RISK_LEVELS),
+    }
+
+def test_incremental_aggregates_match_rebuild():
+    rnd = random.Random(7)
+    db = _session()
+    students = []
+    for i in range(30):
+        user = models.User(email=f"agg.student{i}@gmail.com", hashed_password="x", role=models.UserRole.STUDENT)
+        db.add(user)
+        db.flush()
+        student = models.Student(user_id=user.id, **_random_values(rnd))
+        db.add(student)
+        students.append(student)
+    db.commit()
+    _assert_matches_rebuild(db)
+
+    # Updates of tracked fields, including department moves and clearing values to NULL
+    for student in rnd.sample(students, 15):
+        for name, value in _random_values(rnd).items():
+            if rnd.random() < 0.5:
+                setattr(student, name, value)
+    students[0].department = "CIVIL"
+    students[1].current_cgpa = None
+    db.commit()
+    _assert_matches_rebuild(db)
+
+    # Blind update of an expired instance: the old values have to be read back from the row
+    db.expire(students[2])
+    students[2].department = "ECE"
+    students[2].risk_level = "High"
+    db.commit()
+    _assert_matches_rebuild(db)
+
+    for student in students[:10]:
+        db.delete(student)
+    db.commit()
+    _assert_matches_rebuild(db)
+    db.close()
+
+if __name__ == "__main__":
+    test_incremental_aggregates_match_rebuild()
@@ -0,0 +1,105 @@
+"""
+Invariant check for the per-student feature store: after ORM inserts, updates, moves between students
+and deletes of academic records, feedback and skills, student_features must equal what rebuild()
+computes from the source tables.
+
+Runs against a throwaway SQLite database:
+    python -m pytest test_features.py    or    python test_features.py
+"""
+import math
+import os
+import random
+import tempfile
+
+# Before any app import: app.database builds its engines from DATABASE_URL when imported
+DB_PATH = os.path.join(tempfile.mkdtemp(), "features.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from app import database, models, features
+
+GRADES = ["O", "A", "B", "F", "RA", None]
+
+def _session():
+    engine = database.create_engine_from_settings(f"sqlite:///{DB_PATH}")
+    models.Base.metadata.create_all(bind=engine)
+    return database.sessionmaker(autoflush=False, bind=engine)()
+
+def _snapshot(db):
+    return {
+        row.student_id: {col: getattr(row, col) or 0 for col in features.SUM_COLUMNS}
+        for row in db.query(models.StudentFeature).all()
+    }
+
+def _assert_matches_rebuild(db):
+    incremental = _snapshot(db)
+    features.rebuild(db)
+    rebuilt = _snapshot(db)
+    assert incremental.keys() == rebuilt.keys()
+    for student_id, expected in rebuilt.items():
+        for col, value in expected.items():
+            assert math.isclose(incremental[student_id][col], value, abs_tol=1e-6), (student_id, col, incremental[student_id][col], value)
+
+def _record(rnd, student):
+    return models.AcademicRecord(
+        student_id=student.id, semester=rnd.randint(1, 8), subject="Subject", grade=rnd.choice(GRADES),
+        internal_marks=rnd.uniform(5, 20), external_marks=rnd.uniform(20, 80),
+        attendance_percentage=rnd.choice([rnd.uniform(50, 100), None]),
+    )
+
+def test_incremental_features_match_rebuild():
+    rnd = random.Random(11)
+    db = _session()
+    faculty = models.User(email="features.staff@gmail.com", hashed_password="x", role=models.UserRole.FACULTY)
+    db.add(faculty)
+    students = []
+    for i in range(12):
+        user = models.User(email=f"features.student{i}@gmail.com", hashed_password="x", role=models.UserRole.STUDENT)
+        db.add(user)
+        db.flush()
+        student = models.Student(user_id=user.id, department="CSE")
+        db.add(student)
+        students.append(student)
+    db.flush()
+    records, feedback, skills = [], [], []
+    for student in students[:-1]: # the last student keeps an all-default row
+        records += [_record(rnd, student) for _ in range(rnd.randint(1, 6))]
+        feedback += [models.Feedback(faculty_id=faculty.id, student_id=student.id, overall_rating=rnd.uniform(4, 10)) for _ in range(rnd.randint(0, 3))]
+        skills += [models.Skill(student_id=student.id, skill_name=f"Skill {j}", proficiency_level=rnd.randint(1, 5)) for j in range(rnd.randint(0, 4))]
+    db.add_all(records + feedback + skills)
+    db.commit()
+    _assert_matches_rebuild(db)
+
+    # Updates of tracked columns, NULLs, and rows moved to another student
+    for record in rnd.sample(records, 10):
+        record.external_marks = rnd.uniform(0, 80)
+        record.grade = rnd.choice(GRADES)
+        record.attendance_percentage = rnd.choice([rnd.uniform(50, 100), None])
+    records[0].student_id = students[-1].id
+    records[1].semester = 8
+    feedback[0].overall_rating = 2.0
+    feedback[1].student_id = students[-1].id
+    skills[0].proficiency_level = 5
+    skills[1].student_id = students[-2].id
+    db.commit()
+    _assert_matches_rebuild(db)
+
+    # Blind update of an expired instance: the old values have to be read back from the row
+    db.expire(records[2])
+    records[2].internal_marks = 0.0
+    db.commit()
+    _assert_matches_rebuild(db)
+
+    for row in records[3:8] + feedback[2:4] + skills[2:4]:
+        db.delete(row)
+    # Deleting a student (after its rows) drops its feature row
+    student = students[5]
+    for row in student.academic_records + student.feedback + student.skills:
+        db.delete(row)
+    db.flush()
+    db.delete(student)
+    db.commit()
+    _assert_matches_rebuild(db)
+    db.close()
+
+if __name__ == "__main__":
+    test_incremental_features_match_rebuild()
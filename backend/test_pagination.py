@@ -0,0 +1,159 @@
+"""
+Keyset pagination check for the paged list endpoints: following X-Next-Cursor from the first page
+must return every matching row exactly once, in key order, also when rows are inserted or deleted
+between pages, and must stop without an empty trailing page.
+
+Runs against a throwaway SQLite database:
+    python -m pytest test_pagination.py    or    python test_pagination.py
+"""
+import os
+import tempfile
+
+# Before any app import: app.main creates the schema on DATABASE_URL when imported
+DB_PATH = os.path.join(tempfile.mkdtemp(), "pagination.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app import database, models, auth, pagination
+
+STUDENTS = 45
+STAFF = 12
+# Bound on pages per walk, so a cursor that stops advancing fails instead of looping
+MAX_PAGES = 200
+
+_fixture = None
+
+def _setup():
+    """Route the app to the test database, seeding it on first use; returns a session factory and auth headers."""
+    global _fixture
+    if _fixture is None:
+        _fixture = _seed()
+    session_factory, async_session_factory, headers = _fixture
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[database.get_db] = get_db
+    app.dependency_overrides[database.get_read_db] = get_db
+    app.dependency_overrides[database.get_async_db] = get_async_db
+    app.dependency_overrides[database.get_async_read_db] = get_async_db
+    return session_factory, headers
+
+def _seed():
+    sync_engine = database.create_engine_from_settings(f"sqlite:///{DB_PATH}")
+    async_engine = database.create_engine_from_settings(f"sqlite+aiosqlite:///{DB_PATH}", is_async=True)
+    models.Base.metadata.create_all(bind=sync_engine)
+    session_factory = database.sessionmaker(autoflush=False, bind=sync_engine)
+    async_session_factory = database.async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    db = session_factory()
+    admin = models.User(email="paging.admin@gmail.com", hashed_password="x", role=models.UserRole.ADMIN, full_name="Admin")
+    db.add(admin)
+    for i in range(STAFF):
+        user = models.User(email=f"paging.staff{i}@faculty.com", hashed_password="x", role=models.UserRole.FACULTY, full_name=f"Staff {i}")
+        db.add(user)
+        db.flush()
+        db.add(models.Staff(user_id=user.id, staff_id=f"STFPAGE{i}", department="CSE" if i % 2 else "ECE"))
+    for i in range(STUDENTS):
+        _add_student(db, i, "CSE" if i % 3 else "ECE")
+    db.commit()
+    staff_email = db.query(models.User.email).join(models.Staff).filter(models.Staff.department == "CSE").first()[0]
+    db.close()
+    return session_factory, async_session_factory, {
+        "/admin": {"Authorization": f"Bearer {auth.create_access_token({'sub': 'paging.admin@gmail.com'})}"},
+        "/staff": {"Authorization": f"Bearer {auth.create_access_token({'sub': staff_email})}"},
+    }
+
+def _add_student(db, i, department):
+    user = models.User(email=f"paging.student{i}@gmail.com", hashed_password="x", role=models.UserRole.STUDENT, full_name=f"Student {i}")
+    db.add(user)
+    db.flush()
+    student = models.Student(user_id=user.id, roll_number=f"PAGE{i:03d}", department=department, year=1 + i % 4)
+    db.add(student)
+    db.flush()
+    return student.id
+
+def _ids(client, headers, path, filters=None):
+    response = client.get(path, headers=headers, params=filters)
+    assert response.status_code == 200, f"{path}: {response.status_code} {response.text}"
+    return [row["id"] for row in response.json()]
+
+def _walk(client, headers, path, limit, filters=None, between_pages=None):
+    """Every id reached by following the cursor, and the number of pages fetched."""
+    seen, after, pages = [], None, 0
+    while True:
+        params = {**(filters or {}), "limit": limit, **({"after": after} if after else {})}
+        response = client.get(path, headers=headers, params=params)
+        assert response.status_code == 200, f"{path}: {response.status_code} {response.text}"
+        rows = response.json()
+        pages += 1
+        assert rows, f"{path}: empty page {pages}"
+        assert pages <= MAX_PAGES, f"{path}: cursor does not advance"
+        seen += [row["id"] for row in rows]
+        after = response.headers.get(pagination.NEXT_CURSOR_HEADER)
+        if after is None:
+            return seen, pages
+        if between_pages:
+            between_pages(pages)
+
+def test_cursor_walk_has_no_gaps_or_duplicates():
+    _, headers = _setup()
+    client = TestClient(app)
+    try:
+        cases = [
+            ("/admin/students", None),
+            ("/admin/students", {"department": "ECE"}),
+            ("/admin/students", {"year": 2}),
+            ("/admin/staff", None),
+            ("/staff/students", None),
+        ]
+        for path, filters in cases:
+            route_headers = headers["/" + path.split("/")[1]]
+            expected = sorted(_ids(client, route_headers, path, filters))
+            assert expected
+            for limit in (1, 7, 15, len(expected), len(expected) + 1):
+                seen, pages = _walk(client, route_headers, path, limit, filters)
+                assert seen == expected, f"{path} {filters} limit={limit}"
+                assert pages == -(-len(expected) // limit), f"{path} {filters} limit={limit}: {pages} pages"
+    finally:
+        app.dependency_overrides.clear()
+
+def test_cursor_walk_while_rows_change():
+    session_factory, headers = _setup()
+    client = TestClient(app)
+    try:
+        before = set(_ids(client, headers["/admin"], "/admin/students"))
+        inserted, deleted = [], []
+
+        def change(page):
+            # Insert a row (its random key lands on either side of the cursor) and delete the last one
+            db = session_factory()
+            inserted.append(_add_student(db, 1000 + page, "CSE"))
+            victim = db.query(models.Student).filter(models.Student.id.notin_(inserted + deleted)).order_by(models.Student.id.desc()).first()
+            deleted.append(victim.id)
+            db.delete(victim)
+            db.commit()
+            db.close()
+
+        seen, _ = _walk(client, headers["/admin"], "/admin/students", 10, between_pages=change)
+        assert len(seen) == len(set(seen)), "duplicate rows across pages"
+        assert seen == sorted(seen), "pages out of key order"
+        # Rows present for the whole walk are never skipped; each deleted row was still ahead of the cursor
+        assert before - set(deleted) <= set(seen)
+        assert set(seen) <= before | set(inserted)
+        assert not set(seen) & set(deleted)
+    finally:
+        app.dependency_overrides.clear()
+
+if __name__ == "__main__":
+    test_cursor_walk_has_no_gaps_or_duplicates()
+    test_cursor_walk_while_rows_change()
@@ -0,0 +1,69 @@
+"""
+Invariant check for the /ai prediction cache keys: the same payload scored by the same model artifact
+maps to one key, and any change of artifact (retrained in place at the default path, or another
+registry version activated) maps it to a new one, so stale predictions are never served.
+
+    python -m pytest test_prediction_cache.py    or    python test_prediction_cache.py
+"""
+import os
+import tempfile
+import numpy as np
+import xgboost as xgb
+from app.ai.registry import ModelRegistry, ModelSlot
+from app.ai.risk_model import RiskModel, FEATURES, TRAIN_PARAMS
+from app.prediction_cache import PredictionCache
+
+PAYLOAD = {"attendance_percentage": 62.0, "cgpa_trend": -0.4, "failed_subjects": 2, "feedback_score": 3.1}
+
+def _train(path, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 100, size=(200, len(FEATURES)))
+    y = (rng.uniform(size=200) < 0.5).astype(float)
+    xgb.train(TRAIN_PARAMS, xgb.DMatrix(X, label=y), num_boost_round=3).save_model(path)
+    return path
+
+def _key(cache, model, payload=PAYLOAD):
+    return cache.key("predict-risk", model.cache_version, payload)
+
+def test_key_changes_when_default_artifact_is_retrained_in_place():
+    cache = PredictionCache(maxsize=100, ttl=60)
+    path = _train(os.path.join(tempfile.mkdtemp(), "risk_model.json"), seed=1)
+
+    first = RiskModel(path)
+    assert _key(cache, first) == _key(cache, RiskModel(path)), "same artifact, different key"
+    # Field order doesn't matter
+    assert _key(cache, first) == _key(cache, first, dict(reversed(list(PAYLOAD.items()))))
+
+    _train(path, seed=2)
+    retrained = RiskModel(path)
+    assert retrained.version == first.version is None
+    assert _key(cache, retrained) != _key(cache, first)
+    assert _key(cache, RiskModel(None)) not in (_key(cache, first), _key(cache, retrained))
+
+def test_key_changes_when_another_version_is_activated():
+    cache = PredictionCache(maxsize=100, ttl=60)
+    tmp = tempfile.mkdtemp()
+    registry = ModelRegistry(os.path.join(tmp, "registry"))
+    v1 = registry.publish("risk", _train(os.path.join(tmp, "a.json"), seed=1), activate=True)
+    v2 = registry.publish("risk", _train(os.path.join(tmp, "b.json"), seed=2))
+    slot = ModelSlot(registry, "risk", RiskModel)
+
+    calls = []
+    def score(model):
+        calls.append(model.version)
+        return model.predict(PAYLOAD)
+
+    model = slot.get()
+    first = cache.get_or_compute("predict-risk", model.cache_version, PAYLOAD, lambda: score(model))
+    assert cache.get_or_compute("predict-risk", model.cache_version, PAYLOAD, lambda: score(model)) == first
+    assert calls == [v1]
+
+    registry.activate("risk", v2)
+    slot.reload()
+    model = slot.get()
+    cache.get_or_compute("predict-risk", model.cache_version, PAYLOAD, lambda: score(model))
+    assert calls == [v1, v2], "result cached for v1 was served for v2"
+
+if __name__ == "__main__":
+    test_key_changes_when_default_artifact_is_retrained_in_place()
+    test_key_changes_when_another_version_is_activated()
@@ -0,0 +1,119 @@
+"""
+Query budget check for the list and detail endpoints: each must issue a fixed number of SQL
+statements regardless of how many students, records or feedback rows it serializes (no N+1 lazy loads).
+
+Runs against a throwaway SQLite database:
+    python -m pytest test_query_budget.py    or    python test_query_budget.py
+"""
+import os
+import tempfile
+
+# Before any app import: app.main creates the schema on DATABASE_URL when imported
+DB_PATH = os.path.join(tempfile.mkdtemp(), "budget.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from app.main import app
+from app import database, models, auth
+
+STUDENTS = 40
+
+# endpoint -> max statements per request (principal is already cached, so auth costs nothing)
+BUDGETS = {
+    "/admin/students": 1,
+    "/admin/students?limit=10": 2, # total from aggregates + page
+    "/admin/staff": 1,
+    "/admin/students/{student_id}": 3, # student+user+ai_scores, records, feedback
+    "/admin/staff/{staff_id}": 1,
+    "/staff/students": 2, # staff department + students with users
+    "/staff/my-profile": 1,
+    "/student/profile": 3,
+}
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+def _setup():
+    sync_engine = database.create_engine_from_settings(f"sqlite:///{DB_PATH}")
+    async_engine = database.create_engine_from_settings(f"sqlite+aiosqlite:///{DB_PATH}", is_async=True)
+    models.Base.metadata.create_all(bind=sync_engine)
+    session_factory = database.sessionmaker(autoflush=False, bind=sync_engine)
+    async_session_factory = database.async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[database.get_db] = get_db
+    app.dependency_overrides[database.get_read_db] = get_db
+    app.dependency_overrides[database.get_async_db] = get_async_db
+    app.dependency_overrides[database.get_async_read_db] = get_async_db
+
+    db = session_factory()
+    admin = models.User(email="budget.admin@gmail.com", hashed_password="x", role=models.UserRole.ADMIN, full_name="Admin")
+    faculty = models.User(email="budget.staff@gmail.com", hashed_password="x", role=models.UserRole.FACULTY, full_name="Staff")
+    db.add_all([admin, faculty])
+    db.flush()
+    staff = models.Staff(user_id=faculty.id, staff_id="STFCSE1", department="CSE")
+    db.add(staff)
+    student_ids, student_emails = [], []
+    for i in range(STUDENTS):
+        user = models.User(email=f"budget.student{i}@gmail.com", hashed_password="x", role=models.UserRole.STUDENT, full_name=f"Student {i}")
+        db.add(user)
+        db.flush()
+        student = models.Student(user_id=user.id, roll_number=f"BUDGET{i:03d}", department="CSE", year=1 + i % 4, current_cgpa=7.5)
+        db.add(student)
+        db.flush()
+        db.add(models.AIScore(student_id=student.id, career_suggestions="[]", recommended_courses="{}"))
+        for sem in range(1, 4):
+            db.add(models.AcademicRecord(student_id=student.id, semester=sem, subject=f"Subject {sem}"))
+        student_ids.append(student.id)
+        student_emails.append(user.email)
+    ids = {"student_id": student_ids[0], "staff_id": staff.id}
+    admin_email, faculty_email = admin.email, faculty.email
+    db.commit()
+    db.close()
+
+    counter = QueryCounter()
+    event.listen(sync_engine, "before_cursor_execute", counter)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+    tokens = {
+        "/admin": auth.create_access_token({"sub": admin_email}),
+        "/staff": auth.create_access_token({"sub": faculty_email}),
+        "/student": auth.create_access_token({"sub": student_emails[0]}),
+    }
+    return counter, tokens, ids
+
+def _measure(client, counter, tokens, path):
+    headers = {"Authorization": f"Bearer {tokens['/' + path.split('/')[1]]}"}
+    client.get(path, headers=headers) # warm the principal cache
+    counter.count = 0
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200, f"{path}: {response.status_code} {response.text}"
+    return counter.count
+
+def test_query_budgets():
+    counter, tokens, ids = _setup()
+    client = TestClient(app)
+    try:
+        for template, budget in BUDGETS.items():
+            path = template.format(**ids)
+            used = _measure(client, counter, tokens, path)
+            assert used <= budget, f"{path} issued {used} queries, budget is {budget}"
+    finally:
+        app.dependency_overrides.clear()
+
+if __name__ == "__main__":
+    test_query_budgets()
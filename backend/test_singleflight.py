@@ -0,0 +1,90 @@
+"""
+Invariant check for single-flight coalescing: callers that arrive while a computation for their key
+is in flight get the leader's result (the same object) or the leader's exception, the function runs
+once per flight, different keys don't coalesce, and nothing is reused once the flight has landed.
+
+    python -m pytest test_singleflight.py    or    python test_singleflight.py
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.singleflight import SingleFlight
+
+FOLLOWERS = 7
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+def _flight(flight, key, fn):
+    """Start a leader and FOLLOWERS callers on `key`, releasing the leader once all have joined."""
+    release = threading.Event()
+    calls = []
+
+    def leader_fn():
+        calls.append(threading.current_thread().name)
+        release.wait(5)
+        return fn()
+
+    def call():
+        try:
+            return "result", flight.do(key, leader_fn)
+        except Exception as e:
+            return "error", e
+
+    shared_before = flight.shared
+    with ThreadPoolExecutor(max_workers=FOLLOWERS + 1) as pool:
+        leader = pool.submit(call)
+        _wait_for(lambda: calls)
+        followers = [pool.submit(call) for _ in range(FOLLOWERS)]
+        _wait_for(lambda: flight.shared - shared_before == FOLLOWERS)
+        release.set()
+        outcomes = [leader.result()] + [f.result() for f in followers]
+    assert len(calls) == 1, f"function ran {len(calls)} times in one flight"
+    return outcomes
+
+def test_followers_share_the_leaders_result():
+    flight = SingleFlight()
+    outcomes = _flight(flight, ("overview",), lambda: {"computed": object()})
+    kinds, values = zip(*outcomes)
+    assert set(kinds) == {"result"}
+    assert all(value is values[0] for value in values)
+
+def test_followers_share_the_leaders_exception():
+    flight = SingleFlight()
+    def fail():
+        raise RuntimeError("analytics query failed")
+    outcomes = _flight(flight, ("overview",), fail)
+    kinds, errors = zip(*outcomes)
+    assert set(kinds) == {"error"}
+    assert all(error is errors[0] for error in errors)
+    assert isinstance(errors[0], RuntimeError)
+
+def test_keys_do_not_coalesce_and_landed_flights_are_not_reused():
+    flight = SingleFlight()
+    release = threading.Event()
+    def slow(value):
+        release.wait(5)
+        return value
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        a = pool.submit(flight.do, ("a",), lambda: slow("a"))
+        b = pool.submit(flight.do, ("b",), lambda: slow("b"))
+        _wait_for(lambda: len(flight._calls) == 2)
+        release.set()
+        assert (a.result(), b.result()) == ("a", "b")
+    assert flight.shared == 0
+    # A call after the flight landed computes afresh, also after an error
+    assert flight.do(("a",), lambda: "again") == "again"
+    try:
+        flight.do(("a",), lambda: 1 / 0)
+    except ZeroDivisionError:
+        pass
+    assert flight.do(("a",), lambda: "recovered") == "recovered"
+    assert not flight._calls
+
+if __name__ == "__main__":
+    test_followers_share_the_leaders_result()
+    test_followers_share_the_leaders_exception()
+    test_keys_do_not_coalesce_and_landed_flights_are_not_reused()
@@ -0,0 +1,94 @@
+"""
+Invariant check for the skill inverted index: after builds and incremental updates (skills added,
+changed and removed, department moves, students removed, delta merges), top_k() must return exactly
+what a brute-force ranking over the current skills returns.
+
+    python -m pytest test_skill_index.py    or    python test_skill_index.py
+"""
+import random
+from app.ai.skill_index import SkillIndex, MAX_LEVEL, normalize
+
+SKILLS = ["Python", "SQL", "React", "Docker", "ML", "Go", "Rust", "Figma"]
+DEPARTMENTS = ["CSE", "ECE", "MECH", None]
+
+def _random_student(rnd):
+    """(department, [(skill name, level)]), with occasional case/space variants and duplicates."""
+    skills = []
+    for name in rnd.sample(SKILLS, rnd.randint(0, 4)):
+        skills.append((rnd.choice([name, name.lower(), f" {name.upper()} "]), rnd.randint(0, 6)))
+    if skills and rnd.random() < 0.2:
+        skills.append((skills[0][0].lower(), rnd.randint(1, 5)))
+    return rnd.choice(DEPARTMENTS), skills
+
+def _rows(students, ids):
+    for sid in ids:
+        department, skills = students[sid]
+        if not skills:
+            # Students without skills still come through the join as one row without a skill
+            yield sid, department, None, None
+        for name, level in skills:
+            yield sid, department, name, level
+
+def _brute_force(students, required_skills, k, department=None):
+    required = list(dict.fromkeys(normalize(s) for s in required_skills if s.strip()))
+    ranked = []
+    for sid, (dept, skills) in students.items():
+        if department is not None and (dept or "") != department:
+            continue
+        levels = {}
+        for name, level in skills:
+            levels[normalize(name)] = max(levels.get(normalize(name), 0), min(level or 0, MAX_LEVEL))
+        matched = {name: levels[name] for name in required if levels.get(name)}
+        score = sum(matched.values()) / (MAX_LEVEL * len(required)) if required else 0
+        if score > 0:
+            ranked.append((round(score, 4), sid, matched))
+    ranked.sort(key=lambda r: (-r[0], r[1]))
+    return [(sid, score, matched) for score, sid, matched in ranked[:k]]
+
+def _assert_matches(index, students, rnd, queries=25):
+    for _ in range(queries):
+        required = rnd.sample(SKILLS + ["Cobol"], rnd.randint(1, 4))
+        k = rnd.choice([1, 5, 20, 1000])
+        department = rnd.choice(DEPARTMENTS + [None])
+        got = [(m["student_id"], m["score"], m["matched_skills"]) for m in index.top_k(required, k, department)]
+        assert got == _brute_force(students, required, k, department), (required, k, department)
+
+def _check(merge_ratio):
+    rnd = random.Random(3)
+    students = {f"s{i:04d}": _random_student(rnd) for i in range(300)}
+    index = SkillIndex(merge_ratio=merge_ratio)
+    index.build(_rows(students, students))
+    _assert_matches(index, students, rnd)
+
+    for step in range(30):
+        changed = rnd.sample(sorted(students), rnd.randint(1, 40))
+        for sid in changed:
+            action = rnd.random()
+            if action < 0.15:
+                del students[sid]
+            elif action < 0.3:
+                # Department move, same skills
+                students[sid] = (rnd.choice(DEPARTMENTS), students[sid][1])
+            else:
+                students[sid] = _random_student(rnd)
+        new = [f"n{step:02d}{j}" for j in range(rnd.randint(0, 5))]
+        for sid in new:
+            students[sid] = _random_student(rnd)
+        # Skills never seen before grow the vocabulary mid-stream
+        if step == 10:
+            students[new[0] if new else changed[0]] = ("CSE", [("Cobol", 4)])
+        touched = changed + new
+        index.update(touched, list(_rows(students, [sid for sid in touched if sid in students])))
+        _assert_matches(index, students, rnd, queries=5)
+    _assert_matches(index, students, rnd)
+
+def test_incremental_index_matches_brute_force():
+    _check(merge_ratio=0.1)
+
+def test_delta_only_index_matches_brute_force():
+    # Never merges, so every change lives in the delta block over tombstoned main rows
+    _check(merge_ratio=1e9)
+
+if __name__ == "__main__":
+    test_incremental_index_matches_brute_force()
+    test_delta_only_index_matches_brute_force()
@@ -0,0 +1,160 @@
+"""
+Train the XGBoost risk model straight from the database and publish it to the model registry.
+
+Features and outcome labels are recomputed from the source tables (see features.iter_training_data),
+streamed through a server-side cursor in chunks of --chunk-size students and fed to XGBoost through a
+DataIter, which builds an external-memory quantile matrix cached on disk - so the history tables never
+have to fit in RAM. XGBoost releases before 3.0 (the newest on Python 3.9) lack that matrix; there the
+same iterator builds an in-memory QuantileDMatrix, which holds the quantized features but still never
+the raw rows.
+
+A fixed --holdout-percent of students (by id hash) is kept out of training. The new model is published
+only if its ROC AUC on them beats the rule-based heuristic's; otherwise the script exits with status 1.
+
+    python train_risk_model.py [--chunk-size 50000] [--rounds 200] [--nthread 4] [--activate]
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import log_loss, roc_auc_score
+from app import config, features
+from app.database import read_engine
+from app.ai.registry import ModelRegistry
+from app.ai.risk_model import RiskModel, FEATURES, TRAIN_PARAMS
+
+logging.basicConfig(level=logging.INFO)
+
+# xgboost >= 3.0 only
+EXTERNAL_MEMORY = hasattr(xgb, "ExtMemQuantileDMatrix")
+
+def _in_holdout(student_ids, percent: int) -> np.ndarray:
+    # Stable across runs and passes, unlike a random split
+    return np.array([zlib.crc32(sid.encode()) % 100 < percent for sid in student_ids], dtype=bool)
+
+class StudentFeatureIter(xgb.DataIter):
+    """
+    One pass = one streamed query over every student; XGBoost calls reset() between passes.
+    Holdout students are left out of every pass and collected in eval_X / eval_y on the first.
+    """
+    def __init__(self, chunk_size: int, cache_dir: str, holdout_percent: int):
+        self.chunk_size = chunk_size
+        self.holdout_percent = holdout_percent
+        self.students = 0
+        self.eval_X, self.eval_y = [], []
+        self._first_pass = True
+        self._conn = None
+        self._chunks = None
+        # QuantileDMatrix refuses iterators with a cache prefix
+        super().__init__(cache_prefix=os.path.join(cache_dir, "risk") if EXTERNAL_MEMORY else None)
+
+    def reset(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._conn, self._chunks = None, None
+
+    def next(self, input_data) -> bool:
+        if self._chunks is None:
+            self._conn = read_engine.connect()
+            self._chunks = features.iter_training_data(self._conn, self.chunk_size)
+            self.students = 0
+        for ids, X, y in self._chunks:
+            holdout = _in_holdout(ids, self.holdout_percent)
+            if self._first_pass:
+                self.eval_X.append(X[holdout])
+                self.eval_y.append(y[holdout])
+            if holdout.all():
+                continue
+            input_data(data=X[~holdout], label=y[~holdout], feature_names=FEATURES)
+            self.students += int((~holdout).sum())
+            return True
+        self._first_pass = False
+        return False
+
+def evaluate(model: RiskModel, X: np.ndarray, y: np.ndarray) -> dict:
+    """Holdout ROC AUC and log loss of the trained booster and of the heuristic it must beat."""
+    predicted, baseline = model.predict_proba(X), model.score(X)
+    eps = 1e-6 # the heuristic scores exactly 0 and 1
+    return {
+        "holdout_students": len(y),
+        "holdout_auc": round(float(roc_auc_score(y, predicted)), 4),
+        "holdout_logloss": round(float(log_loss(y, np.clip(predicted, eps, 1 - eps), labels=[0, 1])), 4),
+        "baseline_auc": round(float(roc_auc_score(y, baseline)), 4),
+        "baseline_logloss": round(float(log_loss(y, np.clip(baseline, eps, 1 - eps), labels=[0, 1])), 4),
+    }
+
+def train(args, work_dir: str):
+    """
+    Returns (model, students, train logloss, holdout metrics); the external-memory matrix is freed
+    before its cache dir. Metrics are None when the holdout lacks either outcome.
+    """
+    started = time.perf_counter()
+    batches = StudentFeatureIter(args.chunk_size, work_dir, args.holdout_percent)
+    if EXTERNAL_MEMORY:
+        dtrain = xgb.ExtMemQuantileDMatrix(batches, nthread=args.nthread)
+    else:
+        dtrain = xgb.QuantileDMatrix(batches, nthread=args.nthread)
+    logging.info(f"Built {'external-memory' if EXTERNAL_MEMORY else 'in-memory'} matrix for {batches.students} students in {time.perf_counter() - started:.1f}s")
+    if batches.students == 0:
+        return None, 0, None, None
+
+    model = RiskModel(nthread=config.settings.risk_model_nthread)
+    booster = model.train(dtrain, num_boost_round=args.rounds, params={"max_depth": args.max_depth, "nthread": args.nthread})
+    train_logloss = float(booster.eval(dtrain, "train").split(":")[-1])
+    logging.info(f"Trained {args.rounds} rounds in {time.perf_counter() - started:.1f}s, train logloss {train_logloss:.4f}")
+
+    eval_y = np.concatenate(batches.eval_y) if batches.eval_y else np.empty(0)
+    if len(np.unique(eval_y)) < 2:
+        return model, batches.students, train_logloss, None
+    metrics = evaluate(model, np.concatenate(batches.eval_X), eval_y)
+    logging.info(
+        f"Holdout of {metrics['holdout_students']} students: AUC {metrics['holdout_auc']:.4f} "
+        f"(heuristic {metrics['baseline_auc']:.4f}), logloss {metrics['holdout_logloss']:.4f} "
+        f"(heuristic {metrics['baseline_logloss']:.4f})"
+    )
+    return model, batches.students, train_logloss, metrics
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=50000, help="students per streamed batch")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--max-depth", type=int, default=TRAIN_PARAMS["max_depth"])
+    parser.add_argument("--nthread", type=int, default=os.cpu_count() or 1, help="training threads")
+    parser.add_argument("--holdout-percent", type=int, default=10, help="students kept out of training to evaluate on")
+    parser.add_argument("--activate", action="store_true", help="make the new version the one served")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="risk_train_")
+    try:
+        model, students, train_logloss, metrics = train(args, work_dir)
+        if model is None:
+            logging.error("No students to train on.")
+            return
+        if metrics is None:
+            logging.error("Holdout has no students or only one outcome; not publishing an unevaluated model.")
+            sys.exit(1)
+        if metrics["holdout_auc"] <= metrics["baseline_auc"]:
+            logging.error("Model does not beat the heuristic on the holdout; not publishing.")
+            sys.exit(1)
+        artifact = os.path.join(work_dir, "risk_model.json")
+        model.save(artifact)
+        version = ModelRegistry(config.settings.model_registry_dir).publish("risk", artifact, {
+            "features": FEATURES,
+            "params": {**TRAIN_PARAMS, "max_depth": args.max_depth, "nthread": args.nthread},
+            "rounds": args.rounds,
+            "students": students,
+            "train_logloss": train_logloss,
+            **metrics,
+        }, activate=args.activate)
+        logging.info(f"Published risk model {version}" + (" (active)" if args.activate else ""))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()